@@ -0,0 +1,380 @@
+"""
+Loopback load test for the frame ingest servers.
+
+Starts the ingest server in a child process on 127.0.0.1 (TLS with the cert
+from pems/, or a throwaway self-signed one if pems/ is empty), then for each
+client count streams pre-encoded JPEGs from N simulated phones at a fixed
+fps and reports what the server actually kept up with:
+
+    python -m benchmarks.load --clients 1,2,3,6 --fps 30 --duration 10
+    python -m benchmarks.load --target wss --clip test.mp4 --width 1280 --height 720
+
+    accepted fps   frames decoded by the server per second (all clients)
+    decode ms      mean / p99 JPEG decode time (ingest_decode_seconds)
+    drop %         frames sent but never decoded + decoded frames overwritten
+                   before the consumer (display rate, like frame_parser) saw them
+    loop lag ms    p99 / max delay of a 5 ms timer on the server's event loop
+                   (histogram bucket bounds)
+    cpu %          server process CPU time / wall time (100% = one core)
+
+Server-side numbers are scraped from /metrics before and after each stage.
+"""
+import argparse
+import asyncio
+import json
+import os
+import shutil
+import socket
+import ssl
+import subprocess
+import sys
+import tempfile
+import urllib.request
+from time import perf_counter, process_time
+
+LAG_INTERVAL = 0.005  # seconds between event loop lag probes
+LAG_BUCKETS = (0.0005, 0.001, 0.002, 0.005, 0.01, 0.02, 0.05, 0.1, 0.25, 0.5, 1.0)
+
+
+# -------------------------
+# Server side (child process)
+# -------------------------
+async def _watch_loop(lag_histogram, cpu_gauge):
+    """Measure how late a short sleep wakes up; that's the time other callbacks held the loop."""
+    while True:
+        start = perf_counter()
+        await asyncio.sleep(LAG_INTERVAL)
+        lag = max(0.0, perf_counter() - start - LAG_INTERVAL)
+        lag_histogram.observe(lag)
+        cpu_gauge.set(process_time())
+
+
+async def _consume(consumed, fps):
+    """Stand-in for frame_parser: pick up each client's latest frame at display rate."""
+    from modules.servers.ingest import latest_frames
+
+    seen = {}
+    while True:
+        for client_id, frame in list(latest_frames.items()):
+            if seen.get(client_id) is not frame:
+                seen[client_id] = frame
+                consumed.inc()
+        await asyncio.sleep(1 / fps)
+
+
+async def _serve(args):
+    import uvicorn
+    from modules import metrics
+    from modules.servers import ingest
+    from modules.servers.http_server import app
+
+    ingest.MAX_CLIENTS = args.max_clients
+
+    lag_histogram = metrics.histogram(
+        "loadtest_event_loop_lag_seconds", "Event loop wake-up delay", buckets=LAG_BUCKETS
+    )
+    cpu = metrics.gauge("loadtest_process_cpu_seconds", "CPU time used by the server process")
+    consumed = metrics.counter("loadtest_frames_consumed_total", "Distinct frames picked up by the consumer")
+
+    config = uvicorn.Config(
+        app,
+        host="127.0.0.1",
+        port=args.http_port,
+        ssl_certfile=args.cert,
+        ssl_keyfile=args.key,
+        log_level="warning",
+    )
+    tasks = [
+        asyncio.create_task(uvicorn.Server(config).serve()),
+        asyncio.create_task(_watch_loop(lag_histogram, cpu)),
+        asyncio.create_task(_consume(consumed, args.consume_fps)),
+    ]
+    if args.target == "wss":
+        import websockets
+        from modules.servers.wss_server import handler
+
+        context = ssl.SSLContext(ssl.PROTOCOL_TLS_SERVER)
+        context.load_cert_chain(certfile=args.cert, keyfile=args.key)
+        await websockets.serve(handler, "127.0.0.1", args.wss_port, ssl=context, max_size=None)
+    await asyncio.gather(*tasks)
+
+
+# -------------------------
+# Helpers
+# -------------------------
+def _free_port():
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+def _certificates(tmpdir):
+    """Use pems/ if it has a cert, otherwise make a self-signed one for localhost."""
+    from settings import CERT_FILE, KEY_FILE
+
+    if os.path.exists(CERT_FILE) and os.path.exists(KEY_FILE):
+        return CERT_FILE, KEY_FILE
+    if shutil.which("openssl") is None:
+        sys.exit(f"{CERT_FILE} not found and openssl is not installed (see pems/generate_command.txt)")
+    cert, key = os.path.join(tmpdir, "cert.pem"), os.path.join(tmpdir, "key.pem")
+    subprocess.run(
+        [
+            "openssl", "req", "-x509", "-newkey", "rsa:2048", "-nodes", "-days", "1",
+            "-subj", "/CN=localhost", "-keyout", key, "-out", cert,
+        ],
+        check=True,
+        capture_output=True,
+    )
+    return cert, key
+
+
+def _client_ssl():
+    # Loopback only, self-signed cert
+    context = ssl.create_default_context()
+    context.check_hostname = False
+    context.verify_mode = ssl.CERT_NONE
+    return context
+
+
+def load_frames(clip, width, height, quality, count):
+    """Pre-encode `count` JPEGs so client-side encoding doesn't skew the numbers."""
+    import cv2
+    import numpy as np
+
+    frames = []
+    if clip:
+        cap = cv2.VideoCapture(clip)
+        while len(frames) < count:
+            ok, frame = cap.read()
+            if not ok:
+                break
+            frames.append(cv2.resize(frame, (width, height)))
+        cap.release()
+        if not frames:
+            sys.exit(f"Could not read frames from {clip}")
+    else:
+        # Moving gradient + noise: roughly camera-like JPEG sizes
+        rng = np.random.default_rng(0)
+        xs = np.linspace(0, 255, width, dtype=np.float32)
+        ys = np.linspace(0, 255, height, dtype=np.float32)[:, None]
+        for i in range(count):
+            base = (xs[None, :] + ys + i * 4) % 256
+            frame = np.repeat(base[:, :, None], 3, axis=2)
+            frame[:, :, 1] = (frame[:, :, 1] + 85) % 256
+            frame += rng.normal(0, 6, frame.shape).astype(np.float32)
+            frames.append(np.clip(frame, 0, 255).astype(np.uint8))
+
+    encoded = []
+    for frame in frames:
+        ok, jpeg = cv2.imencode(".jpg", frame, [cv2.IMWRITE_JPEG_QUALITY, quality])
+        encoded.append(jpeg.tobytes())
+    return encoded
+
+
+def scrape(url):
+    """Fetch /metrics and return {sample name with labels: value}."""
+    with urllib.request.urlopen(url, context=_client_ssl(), timeout=5) as response:
+        text = response.read().decode()
+    samples = {}
+    for line in text.splitlines():
+        if line and not line.startswith("#"):
+            name, _, value = line.rpartition(" ")
+            samples[name] = float(value)
+    return samples
+
+
+def _delta(before, after, name):
+    return after.get(name, 0.0) - before.get(name, 0.0)
+
+
+def _histogram_quantile(before, after, name, q):
+    """Approximate quantile (upper bucket bound) of observations made between two scrapes."""
+    prefix = name + '_bucket{le="'
+    buckets = sorted(
+        (float(key[len(prefix):-2]), _delta(before, after, key))
+        for key in after
+        if key.startswith(prefix)
+    )
+    if not buckets or buckets[-1][1] <= 0:
+        return 0.0
+    target = q * buckets[-1][1]
+    for bound, cumulative in buckets:
+        if cumulative >= target:
+            return bound
+    return buckets[-1][0]
+
+
+# -------------------------
+# Client side
+# -------------------------
+async def _client(url, frames, fps, duration, stats):
+    import websockets
+
+    try:
+        ws = await websockets.connect(url, ssl=_client_ssl(), max_size=None)
+    except Exception as e:
+        stats["connect_errors"] += 1
+        print("connect failed:", e)
+        return
+
+    interval = 1 / fps
+    start = perf_counter()
+    next_send = start
+    i = 0
+    try:
+        while True:
+            now = perf_counter()
+            if now - start >= duration:
+                break
+            if now < next_send:
+                await asyncio.sleep(next_send - now)
+                continue
+            # Like a camera: if we fell behind, drop frames instead of bursting
+            behind = int((now - next_send) / interval)
+            stats["skipped"] += behind
+            next_send += (behind + 1) * interval
+
+            await ws.send(frames[i % len(frames)])
+            i += 1
+            stats["sent"] += 1
+    except websockets.ConnectionClosed:
+        stats["closed_early"] += 1
+    finally:
+        stats["active"].append(ws)
+
+
+async def run_stage(ws_url, metrics_url, frames, clients, fps, duration):
+    stats = {"sent": 0, "skipped": 0, "connect_errors": 0, "closed_early": 0, "active": []}
+    before = await asyncio.to_thread(scrape, metrics_url)
+    start = perf_counter()
+    await asyncio.gather(*(_client(ws_url, frames, fps, duration, stats) for _ in range(clients)))
+    # Let the server finish decoding what's in flight before scraping
+    await asyncio.sleep(0.5)
+    after = await asyncio.to_thread(scrape, metrics_url)
+    wall = perf_counter() - start
+    for ws in stats.pop("active"):
+        await ws.close()
+
+    decoded = _delta(before, after, "ingest_decode_seconds_count")
+    consumed = _delta(before, after, "loadtest_frames_consumed_total")
+    sent = stats["sent"]
+    return {
+        "clients": clients,
+        "target_fps": fps * clients,
+        "sent": sent,
+        "sent_fps": sent / duration,
+        "client_skipped": stats["skipped"],
+        "rejected": int(_delta(before, after, "ingest_clients_rejected_total")) + stats["connect_errors"],
+        "accepted_fps": decoded / duration,
+        "decode_ms_mean": 1000 * _delta(before, after, "ingest_decode_seconds_sum") / decoded if decoded else 0.0,
+        "decode_ms_p99": 1000 * _histogram_quantile(before, after, "ingest_decode_seconds", 0.99),
+        "drop_not_decoded": 1 - decoded / sent if sent else 0.0,
+        "drop_overwritten": 1 - consumed / decoded if decoded else 0.0,
+        "loop_lag_ms_p99": 1000 * _histogram_quantile(before, after, "loadtest_event_loop_lag_seconds", 0.99),
+        "loop_lag_ms_max": 1000 * _histogram_quantile(before, after, "loadtest_event_loop_lag_seconds", 1.0),
+        "cpu_percent": 100 * _delta(before, after, "loadtest_process_cpu_seconds") / wall,
+    }
+
+
+def _print_row(r):
+    print(
+        f"{r['clients']:>7} {r['target_fps']:>8.0f} {r['accepted_fps']:>9.1f} "
+        f"{r['decode_ms_mean']:>7.2f} {r['decode_ms_p99']:>7.2f} "
+        f"{100 * r['drop_not_decoded']:>6.1f} {100 * r['drop_overwritten']:>6.1f} "
+        f"{r['loop_lag_ms_p99']:>7.1f} {r['loop_lag_ms_max']:>7.1f} {r['cpu_percent']:>6.1f}"
+        + (f"  rejected={r['rejected']}" if r["rejected"] else "")
+    )
+
+
+async def _wait_for_server(metrics_url, process, timeout=30):
+    deadline = perf_counter() + timeout
+    while perf_counter() < deadline:
+        if process.poll() is not None:
+            sys.exit("Server process exited during startup")
+        try:
+            await asyncio.to_thread(scrape, metrics_url)
+            return
+        except OSError:
+            await asyncio.sleep(0.2)
+    sys.exit("Server did not start in time")
+
+
+async def run(args):
+    counts = [int(c) for c in args.clients.split(",")]
+    frames = load_frames(args.clip, args.width, args.height, args.quality, args.frames)
+    print(f"{len(frames)} frames, {args.width}x{args.height} q{args.quality}, "
+          f"avg {sum(map(len, frames)) / len(frames) / 1024:.1f} KiB")
+
+    with tempfile.TemporaryDirectory() as tmpdir:
+        cert, key = _certificates(tmpdir)
+        http_port, wss_port = _free_port(), _free_port()
+        server = subprocess.Popen(
+            [
+                sys.executable, "-m", "benchmarks.load", "--serve",
+                "--target", args.target,
+                "--http-port", str(http_port), "--wss-port", str(wss_port),
+                "--cert", cert, "--key", key,
+                "--max-clients", str(max(counts)),
+                "--consume-fps", str(args.consume_fps),
+            ],
+            stdout=subprocess.DEVNULL if not args.verbose else None,
+        )
+        metrics_url = f"https://127.0.0.1:{http_port}/metrics"
+        ws_url = (
+            f"wss://127.0.0.1:{wss_port}"
+            if args.target == "wss"
+            else f"wss://127.0.0.1:{http_port}/ws"
+        )
+        results = []
+        try:
+            await _wait_for_server(metrics_url, server)
+            print(f"{'clients':>7} {'target':>8} {'accepted':>9} {'dec ms':>7} {'dec p99':>7} "
+                  f"{'lost%':>6} {'ovw%':>6} {'lag p99':>7} {'lag max':>7} {'cpu%':>6}")
+            for clients in counts:
+                result = await run_stage(ws_url, metrics_url, frames, clients, args.fps, args.duration)
+                results.append(result)
+                _print_row(result)
+                await asyncio.sleep(args.pause)
+        finally:
+            server.terminate()
+            server.wait()
+
+    if args.json:
+        with open(args.json, "w") as f:
+            json.dump({"target": args.target, "fps": args.fps, "width": args.width,
+                       "height": args.height, "quality": args.quality, "stages": results}, f, indent=2)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Loopback load test for frame ingest")
+    parser.add_argument("--target", choices=["http", "wss"], default="http",
+                        help="http: /ws on the web server, wss: standalone websockets server")
+    parser.add_argument("--clients", default="1,2,3", help="comma-separated client counts, one stage each")
+    parser.add_argument("--fps", type=float, default=30.0, help="frames per second per client")
+    parser.add_argument("--duration", type=float, default=10.0, help="seconds per stage")
+    parser.add_argument("--pause", type=float, default=1.0, help="seconds between stages")
+    parser.add_argument("--clip", help="video file to stream (default: synthetic frames)")
+    parser.add_argument("--width", type=int, default=640)
+    parser.add_argument("--height", type=int, default=480)
+    parser.add_argument("--quality", type=int, default=70, help="JPEG quality")
+    parser.add_argument("--frames", type=int, default=120, help="distinct frames to cycle through")
+    parser.add_argument("--consume-fps", type=float, default=30.0, help="rate the server-side consumer polls")
+    parser.add_argument("--json", metavar="PATH", help="write results as JSON")
+    parser.add_argument("-v", "--verbose", action="store_true", help="show server output")
+    # Internal: child process
+    parser.add_argument("--serve", action="store_true", help=argparse.SUPPRESS)
+    parser.add_argument("--http-port", type=int, help=argparse.SUPPRESS)
+    parser.add_argument("--wss-port", type=int, help=argparse.SUPPRESS)
+    parser.add_argument("--cert", help=argparse.SUPPRESS)
+    parser.add_argument("--key", help=argparse.SUPPRESS)
+    parser.add_argument("--max-clients", type=int, default=3, help=argparse.SUPPRESS)
+    args = parser.parse_args(argv)
+
+    try:
+        asyncio.run(_serve(args) if args.serve else run(args))
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,308 @@
+"""
+Micro-benchmarks for gesture primitives, detectors and the controller.
+
+    python -m benchmarks.micro                          # print table
+    python -m benchmarks.micro --json out.json          # also write JSON
+    python -m benchmarks.micro --save-baseline          # store benchmarks/baseline.json
+    python -m benchmarks.micro --compare                # fail (exit 1) on regressions
+    python -m benchmarks.micro -k detector              # only names containing "detector"
+
+Every case is timed per call with perf_counter_ns (percentiles in µs), then
+run again under tracemalloc to report the peak bytes allocated per call.
+Inputs come from benchmarks/synthetic.py, so no camera or MediaPipe graph
+is needed.
+"""
+import argparse
+import gc
+import json
+import platform
+import sys
+import tracemalloc
+from pathlib import Path
+from time import perf_counter_ns
+
+from benchmarks.synthetic import POSES, EPISODES, episode, session
+
+DEFAULT_BASELINE = Path(__file__).resolve().parent / "baseline.json"
+DEFAULT_ITERATIONS = 20000
+DEFAULT_THRESHOLD = 0.20  # p50 may get 20% slower before it counts as a regression
+
+
+# -------------------------
+# Cases
+# -------------------------
+class Case:
+    """
+    A benchmark case: `setup()` returns a zero-argument callable to time.
+    Stateful cases cycle through a synthetic timeline inside that callable.
+    """
+
+    def __init__(self, name, setup):
+        self.name = name
+        self.setup = setup
+
+
+def _stateless_cases():
+    from modules.gesture import stateless
+
+    cases = []
+    for fn_name in ("get_fingers_status", "is_fist", "is_open_palm", "detect_static_gesture"):
+        fn = getattr(stateless, fn_name)
+        for pose_name in ("open_palm", "fist", "v_sign"):
+            pose = POSES[pose_name]
+            cases.append(Case(f"stateless.{fn_name}[{pose_name}]", lambda fn=fn, pose=pose: (lambda: fn(pose))))
+    return cases
+
+
+def _new_tracker():
+    from modules.gesture import HandTracker
+
+    # Replay-style tracker: fixed clock, no MediaPipe graph, no sounds
+    return HandTracker(clock=lambda: 0.0, sound_effects=False)
+
+
+def _timeline_runner(frames, step):
+    """
+    Return a callable that feeds the next frame and runs `step(tracker, now)`.
+    The timed call includes process_landmarks(), which every real frame pays too.
+    """
+    tracker = _new_tracker()
+    state = {"i": 0, "offset": 0.0}
+    span = frames[-1][0] + 1.0
+
+    def run():
+        i = state["i"]
+        ts, hands = frames[i]
+        now = ts + state["offset"]
+        tracker.process_landmarks(hands, now=now)
+        result = step(tracker, now)
+        i += 1
+        if i == len(frames):
+            # Keep time monotonic when the timeline wraps around
+            i = 0
+            state["offset"] += span
+        state["i"] = i
+        return result
+
+    return run
+
+
+def _detector_cases():
+    from modules.gesture.detectors.stop import detect_stop
+    from modules.gesture.detectors.swipe import detect_swipe
+    from modules.gesture.detectors.volume import detect_volume
+    from modules.gesture.detectors.reserve import detect_reserve
+    from modules.gesture.detectors.like_dislike import detect_like_dislike
+
+    detectors = {
+        "stop": (detect_stop, ["stop", "none"]),
+        "swipe": (detect_swipe, ["swipe_right", "swipe_left"]),
+        "volume": (detect_volume, ["volume_up", "volume_down"]),
+        "reserve": (detect_reserve, ["reserve1", "reserve2", "reserve3"]),
+        "like_dislike": (detect_like_dislike, ["like", "dislike"]),
+    }
+    cases = []
+    for name, (fn, kinds) in detectors.items():
+        frames = session(kinds)
+        cases.append(
+            Case(
+                f"detector.{name}",
+                lambda fn=fn, frames=frames: _timeline_runner(frames, lambda t, now: fn(t, now=now)),
+            )
+        )
+    return cases
+
+
+def _tracker_cases():
+    frames = session(EPISODES)
+    return [
+        Case(
+            "tracker.detect_gesture[all episodes]",
+            lambda: _timeline_runner(frames, lambda t, now: t.detect_gesture(now=now)),
+        ),
+        Case(
+            "tracker.process_landmarks+detect_gesture[idle]",
+            lambda: _timeline_runner(episode("none"), lambda t, now: t.detect_gesture(now=now)),
+        ),
+    ]
+
+
+class _NullPlayer:
+    """Player stand-in so the benchmark measures the controller, not audio."""
+
+    def play(self): pass
+    def stop(self): pass
+    def next(self): pass
+    def prev(self): pass
+
+
+def _controller_cases():
+    from modules.controller import GestureController
+
+    gestures = ["Next", None, None, "Play", None, "Pause", "Previous", None, ("VolumeUp", 0.4)]
+
+    def setup():
+        controller = GestureController(_NullPlayer(), cooldown=2.5)
+        state = {"i": 0, "now": 0.0}
+
+        def run():
+            g = gestures[state["i"] % len(gestures)]
+            state["i"] += 1
+            state["now"] += 1 / 30
+            controller.handle_gesture(g, now=state["now"])
+
+        return run
+
+    return [Case("controller.handle_gesture", setup)]
+
+
+def all_cases():
+    return _stateless_cases() + _detector_cases() + _tracker_cases() + _controller_cases()
+
+
+# -------------------------
+# Measurement
+# -------------------------
+def _percentile(sorted_values, q):
+    if not sorted_values:
+        return 0.0
+    k = (len(sorted_values) - 1) * q
+    lo = int(k)
+    hi = min(lo + 1, len(sorted_values) - 1)
+    return sorted_values[lo] + (sorted_values[hi] - sorted_values[lo]) * (k - lo)
+
+
+def measure(case: Case, iterations: int, warmup: int = 1000):
+    fn = case.setup()
+    for _ in range(warmup):
+        fn()
+
+    # Latency
+    samples = [0] * iterations
+    gc_was_enabled = gc.isenabled()
+    gc.disable()
+    try:
+        for i in range(iterations):
+            start = perf_counter_ns()
+            fn()
+            samples[i] = perf_counter_ns() - start
+    finally:
+        if gc_was_enabled:
+            gc.enable()
+    samples.sort()
+
+    # Allocations (separate pass: tracemalloc slows every allocation down)
+    alloc_iterations = max(1, min(iterations // 10, 2000))
+    fn = case.setup()
+    for _ in range(warmup):
+        fn()
+    tracemalloc.start()
+    peak_total = 0
+    start_current, _ = tracemalloc.get_traced_memory()
+    for _ in range(alloc_iterations):
+        tracemalloc.reset_peak()
+        before, _ = tracemalloc.get_traced_memory()
+        fn()
+        _, peak = tracemalloc.get_traced_memory()
+        peak_total += peak - before
+    end_current, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    us = 1000.0
+    return {
+        "iterations": iterations,
+        "min_us": samples[0] / us,
+        "mean_us": sum(samples) / len(samples) / us,
+        "p50_us": _percentile(samples, 0.50) / us,
+        "p90_us": _percentile(samples, 0.90) / us,
+        "p99_us": _percentile(samples, 0.99) / us,
+        "max_us": samples[-1] / us,
+        "peak_bytes_per_call": peak_total / alloc_iterations,
+        "retained_bytes_per_call": (end_current - start_current) / alloc_iterations,
+    }
+
+
+# -------------------------
+# Baseline comparison
+# -------------------------
+def compare(results, baseline, threshold):
+    """Return a list of (name, metric, old, new) regressions."""
+    regressions = []
+    for name, new in results.items():
+        old = baseline.get(name)
+        if old is None:
+            continue
+        if new["p50_us"] > old["p50_us"] * (1 + threshold):
+            regressions.append((name, "p50_us", old["p50_us"], new["p50_us"]))
+        # Allocation growth is a regression regardless of machine speed
+        if new["peak_bytes_per_call"] > old["peak_bytes_per_call"] * (1 + threshold) + 64:
+            regressions.append(
+                (name, "peak_bytes_per_call", old["peak_bytes_per_call"], new["peak_bytes_per_call"])
+            )
+    return regressions
+
+
+def _print_table(results, baseline=None):
+    header = f"{'benchmark':<48} {'p50 µs':>9} {'p90 µs':>9} {'p99 µs':>9} {'peak B':>8}"
+    if baseline:
+        header += f" {'Δp50':>8}"
+    print(header)
+    print("-" * len(header))
+    for name, r in results.items():
+        line = (
+            f"{name:<48} {r['p50_us']:>9.2f} {r['p90_us']:>9.2f} "
+            f"{r['p99_us']:>9.2f} {r['peak_bytes_per_call']:>8.0f}"
+        )
+        old = (baseline or {}).get(name)
+        if old:
+            line += f" {(r['p50_us'] / old['p50_us'] - 1) * 100:>+7.1f}%"
+        print(line)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Gesture micro-benchmarks")
+    parser.add_argument("-k", "--filter", default="", help="only run benchmarks whose name contains this")
+    parser.add_argument("-n", "--iterations", type=int, default=DEFAULT_ITERATIONS)
+    parser.add_argument("--json", metavar="PATH", help="write results as JSON")
+    parser.add_argument("--baseline", default=str(DEFAULT_BASELINE), help="baseline JSON path")
+    parser.add_argument("--save-baseline", action="store_true", help="overwrite the baseline with this run")
+    parser.add_argument("--compare", action="store_true", help="exit 1 if slower than the baseline")
+    parser.add_argument("--threshold", type=float, default=DEFAULT_THRESHOLD)
+    args = parser.parse_args(argv)
+
+    results = {}
+    for case in all_cases():
+        if args.filter in case.name:
+            results[case.name] = measure(case, args.iterations)
+
+    baseline_path = Path(args.baseline)
+    baseline = None
+    if baseline_path.exists():
+        baseline = json.loads(baseline_path.read_text()).get("results", {})
+
+    _print_table(results, baseline)
+
+    report = {
+        "python": sys.version.split()[0],
+        "platform": platform.platform(),
+        "results": results,
+    }
+    if args.json:
+        Path(args.json).write_text(json.dumps(report, indent=2))
+    if args.save_baseline:
+        baseline_path.write_text(json.dumps(report, indent=2))
+        print(f"Baseline saved to {baseline_path}")
+
+    if args.compare:
+        if baseline is None:
+            print(f"No baseline at {baseline_path}, run with --save-baseline first")
+            return 2
+        regressions = compare(results, baseline, args.threshold)
+        for name, metric, old, new in regressions:
+            print(f"REGRESSION {name} {metric}: {old:.2f} -> {new:.2f}")
+        return 1 if regressions else 0
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,118 @@
+"""
+Synthetic hand landmarks for benchmarks and offline checks.
+
+All poses are 21 (x, y) pixel points in image coordinates (y grows downward)
+built around a wrist at (320, 400), so they satisfy the same geometric rules
+the stateless helpers and detectors use. Episodes are lists of
+(timestamp, hands) frames at a fixed fps, suitable for
+HandTracker.process_landmarks(hands, now=timestamp).
+"""
+from typing import Dict, List, Tuple
+
+from modules.gesture.stateless import Point
+
+FPS = 30.0
+
+WRIST = (320, 400)
+FINGER_X = {"index": 290, "middle": 320, "ring": 350, "pinky": 380}
+FINGER_IDS = {
+    "index": (5, 6, 7, 8),
+    "middle": (9, 10, 11, 12),
+    "ring": (13, 14, 15, 16),
+    "pinky": (17, 18, 19, 20),
+}
+UP_Y = (300, 250, 220, 190)      # MCP, PIP, DIP, TIP
+FOLDED_Y = (300, 250, 265, 280)  # tip below PIP
+
+# Thumb (1..4) shapes
+THUMB_SIDE = ((290, 380), (260, 350), (240, 320), (220, 300))     # relaxed, beside palm
+THUMB_ACROSS = ((270, 340), (295, 340), (320, 340), (350, 340))   # crosses wrist->index lines
+THUMB_UP = ((280, 370), (275, 320), (272, 260), (270, 200))
+THUMB_DOWN = ((280, 370), (275, 410), (272, 450), (270, 480))
+
+
+def hand(up=("index", "middle", "ring", "pinky"), thumb=THUMB_SIDE, dx=0, dy=0) -> List[Point]:
+    """Build one hand with the given fingers up, shifted by (dx, dy)."""
+    lm = [(0, 0)] * 21
+    lm[0] = WRIST
+    for i, point in enumerate(thumb, start=1):
+        lm[i] = point
+    for name, ids in FINGER_IDS.items():
+        ys = UP_Y if name in up else FOLDED_Y
+        for idx, y in zip(ids, ys):
+            lm[idx] = (FINGER_X[name], y)
+    return [(x + dx, y + dy) for x, y in lm]
+
+
+def pinch(dx=0, dy=0) -> List[Point]:
+    """Index folded with thumb tip touching it (volume mode)."""
+    lm = hand(up=("middle", "ring", "pinky"), dx=dx, dy=dy)
+    ix, iy = lm[8]
+    lm[4] = (ix - 10, iy + 5)
+    return lm
+
+
+# Single poses, one per gesture class
+POSES: Dict[str, List[Point]] = {
+    "open_palm": hand(),
+    "fist": hand(up=(), thumb=THUMB_ACROSS),
+    "like": hand(up=(), thumb=THUMB_UP),
+    "dislike": hand(up=(), thumb=THUMB_DOWN),
+    "reserve1": hand(up=("index",), thumb=THUMB_ACROSS),
+    "reserve2": hand(up=("index", "middle"), thumb=THUMB_ACROSS),
+    "reserve3": hand(up=("index", "middle", "ring"), thumb=THUMB_ACROSS),
+    "pinch": pinch(),
+    "v_sign": hand(up=("index", "middle"), thumb=THUMB_DOWN),  # static "Play"
+}
+
+
+Frame = Tuple[float, List[List[Point]]]
+
+
+def _frames(poses, start: float, fps: float = FPS) -> List[Frame]:
+    return [(start + i / fps, [p] if p is not None else []) for i, p in enumerate(poses)]
+
+
+def episode(kind: str, start: float = 0.0, fps: float = FPS) -> List[Frame]:
+    """
+    Full gesture episode: hold an open palm long enough to arm the detectors,
+    then perform `kind`, then no hand for a few seconds so cooldowns and
+    validity windows expire before the next episode.
+    """
+    arm = [POSES["open_palm"]] * int(1.3 * fps)
+
+    if kind == "stop":
+        action = [POSES["fist"]] * int(0.8 * fps)
+    elif kind in ("like", "dislike", "reserve1", "reserve2", "reserve3"):
+        action = [POSES[kind]] * int(1.0 * fps)
+    elif kind in ("swipe_right", "swipe_left"):
+        step = 25 if kind == "swipe_right" else -25
+        action = [hand(dx=step * i) for i in range(10)]
+    elif kind in ("volume_up", "volume_down"):
+        step = -8 if kind == "volume_up" else 8
+        action = [pinch(dy=step * i) for i in range(12)]
+    elif kind == "none":
+        action = [POSES["open_palm"]] * int(0.5 * fps)
+    else:
+        raise ValueError(f"Unknown episode kind {kind!r}")
+
+    idle = [None] * int(3.0 * fps)
+    return _frames(arm + action + idle, start, fps)
+
+
+EPISODES = [
+    "stop", "like", "dislike", "reserve1", "reserve2", "reserve3",
+    "swipe_right", "swipe_left", "volume_up", "volume_down", "none",
+]
+
+
+def session(kinds=EPISODES, repeat: int = 1, fps: float = FPS) -> List[Frame]:
+    """Concatenate episodes into one continuous, monotonic timeline."""
+    frames: List[Frame] = []
+    t = 0.0
+    for _ in range(repeat):
+        for kind in kinds:
+            ep = episode(kind, start=t, fps=fps)
+            frames.extend(ep)
+            t = ep[-1][0] + 1 / fps
+    return frames
@@ -0,0 +1,2 @@
+from modules.headless import main
+main()
@@ -1,21 +1,248 @@
+"""
+Frame sources for the desktop pipeline.
+
+    Camera(0, width=1280, height=720, fps=30, fourcc="MJPG")   # capture device
+    VideoFileSource("clip.mp4", realtime=False)                  # reproducible runs
+    ImageDirectorySource("frames/", fps=30)
+    open_source(CAMERA_SOURCE)   # int/"0" -> Camera, directory -> images, file -> video
+
+Every source returns BGR frames from a FramePool; a frame stays valid until
+the next get_frame() call (retain it in `source.pool` to keep it longer).
+`source.timestamp` is the time of the last frame: wall clock for devices,
+position in the stream for files, so max-speed playback gives the tracker
+the same timings as real-time playback. `source.finished` turns True when a
+file source runs out of frames (and loop=False).
+"""
+import os
+from time import perf_counter, sleep, time
+from typing import Optional
+
 import cv2
+import numpy as np
+
+from modules import metrics
+from modules.frame_pool import FramePool
+
+CAMERA_READ_SECONDS = metrics.histogram("camera_read_seconds", "Time to read and flip one camera frame")
+CAMERA_FRAMES = metrics.counter("camera_frames_total", "Frames read from the camera")
+CAMERA_FAILURES = metrics.counter("camera_read_failures_total", "Failed camera reads")
 
+IMAGE_EXTENSIONS = (".jpg", ".jpeg", ".png", ".bmp", ".webp")
 
-class Camera:
-    def __init__(self, index=0):
-        self.cap = cv2.VideoCapture(index)
+
+class FrameSource:
+    """Base class: subclasses implement _read() returning a BGR array or None."""
+
+    def __init__(self, pool: Optional[FramePool] = None, mirror: bool = False):
+        self.pool = pool or FramePool("camera")
+        self.mirror = mirror
+        self.timestamp: Optional[float] = None
+        self.finished = False
+        self._last = None  # our reference to the previously returned frame
+
+    def _read(self):
+        raise NotImplementedError
 
     def get_frame(self):
-        success, frame = self.cap.read()
+        self.pool.release(self._last)
+        self._last = None
+        with CAMERA_READ_SECONDS.time():
+            raw = self._read()
+            if raw is None:
+                CAMERA_FAILURES.inc()
+                return None
+            frame = self.pool.acquire(raw.shape, raw.dtype)
+            if self.mirror:
+                cv2.flip(raw, 1, dst=frame)
+            else:
+                np.copyto(frame, raw)
+        CAMERA_FRAMES.inc()
+        self._last = frame
+        return frame
+
+    def release(self):
+        self.pool.release(self._last)
+        self._last = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.release()
+        return False
+
+
+class Camera(FrameSource):
+    """
+    Capture device. Requested settings are applied before the first read and
+    what the driver actually accepted is in `self.negotiated`. MJPG keeps USB
+    bandwidth low at higher resolutions; buffer_size=1 avoids processing stale
+    frames queued by the driver. None leaves a setting at the driver default.
+    """
+
+    def __init__(
+        self,
+        index=0,
+        width: Optional[int] = None,
+        height: Optional[int] = None,
+        fps: Optional[float] = None,
+        fourcc: Optional[str] = None,
+        buffer_size: Optional[int] = None,
+        backend: int = cv2.CAP_ANY,
+        mirror: bool = True,
+        pool: Optional[FramePool] = None,
+    ):
+        super().__init__(pool, mirror)
+        self.cap = cv2.VideoCapture(index, backend)
+        self._raw = None    # capture buffer, filled in place by cap.read()
+
+        # FOURCC first: some drivers only offer high resolutions in MJPG
+        if fourcc:
+            self.cap.set(cv2.CAP_PROP_FOURCC, cv2.VideoWriter_fourcc(*fourcc))
+        if width:
+            self.cap.set(cv2.CAP_PROP_FRAME_WIDTH, width)
+        if height:
+            self.cap.set(cv2.CAP_PROP_FRAME_HEIGHT, height)
+        if fps:
+            self.cap.set(cv2.CAP_PROP_FPS, fps)
+        if buffer_size is not None:
+            self.cap.set(cv2.CAP_PROP_BUFFERSIZE, buffer_size)
+
+        self.negotiated = self._negotiated()
+        requested = dict(width=width, height=height, fps=fps, fourcc=fourcc)
+        mismatched = {k: v for k, v in requested.items() if v and self.negotiated[k] != v}
+        if self.cap.isOpened() and mismatched:
+            print(f"Camera {index}: requested {mismatched}, got {self.negotiated}")
+
+    def _negotiated(self):
+        code = int(self.cap.get(cv2.CAP_PROP_FOURCC))
+        fourcc = "".join(chr((code >> (8 * i)) & 0xFF) for i in range(4)) if code else None
+        return {
+            "width": int(self.cap.get(cv2.CAP_PROP_FRAME_WIDTH)),
+            "height": int(self.cap.get(cv2.CAP_PROP_FRAME_HEIGHT)),
+            "fps": self.cap.get(cv2.CAP_PROP_FPS),
+            "fourcc": fourcc,
+            "buffer_size": int(self.cap.get(cv2.CAP_PROP_BUFFERSIZE)),
+        }
+
+    def _read(self):
+        success, raw = self.cap.read(self._raw)
         if not success:
             return None
-        return cv2.flip(frame, 1)
+        self._raw = raw
+        self.timestamp = time()
+        return raw
 
     def release(self):
+        super().release()
         self.cap.release()
         cv2.destroyAllWindows()
 
 
+class _PacedSource(FrameSource):
+    """File-backed source: paces to `fps` when realtime, stamps frames by position."""
+
+    def __init__(self, fps: float, realtime: bool, loop: bool, mirror: bool, pool):
+        super().__init__(pool, mirror)
+        self.fps = fps
+        self.realtime = realtime
+        self.loop = loop
+        self.index = 0               # frames returned so far
+        self._start_time = time()    # timestamp of frame 0
+        self._start_wall = None
+
+    def _due(self):
+        """Sleep until the current frame is due (realtime only) and set its timestamp."""
+        offset = self.index / self.fps
+        if self.realtime:
+            if self._start_wall is None:
+                self._start_wall = perf_counter()
+            delay = offset - (perf_counter() - self._start_wall)
+            if delay > 0:
+                sleep(delay)
+        self.timestamp = self._start_time + offset
+        self.index += 1
+
+
+class VideoFileSource(_PacedSource):
+    def __init__(
+        self,
+        path: str,
+        realtime: bool = True,
+        loop: bool = False,
+        mirror: bool = False,
+        fps: Optional[float] = None,
+        pool: Optional[FramePool] = None,
+    ):
+        self.cap = cv2.VideoCapture(path)
+        if not self.cap.isOpened():
+            raise ValueError(f"Could not open video {path}")
+        super().__init__(fps or self.cap.get(cv2.CAP_PROP_FPS) or 30.0, realtime, loop, mirror, pool)
+        self.path = path
+        self._raw = None
+
+    def _read(self):
+        success, raw = self.cap.read(self._raw)
+        if not success and self.loop and self.index:
+            self.cap.set(cv2.CAP_PROP_POS_FRAMES, 0)
+            success, raw = self.cap.read(self._raw)
+        if not success:
+            self.finished = True
+            return None
+        self._raw = raw
+        self._due()
+        return raw
+
+    def release(self):
+        super().release()
+        self.cap.release()
+
+
+class ImageDirectorySource(_PacedSource):
+    """Plays the images of a directory in file-name order."""
+
+    def __init__(
+        self,
+        directory: str,
+        fps: float = 30.0,
+        realtime: bool = True,
+        loop: bool = False,
+        mirror: bool = False,
+        pool: Optional[FramePool] = None,
+    ):
+        super().__init__(fps, realtime, loop, mirror, pool)
+        self.paths = sorted(
+            os.path.join(directory, name)
+            for name in os.listdir(directory)
+            if name.lower().endswith(IMAGE_EXTENSIONS)
+        )
+        if not self.paths:
+            raise ValueError(f"No images in {directory}")
+
+    def _read(self):
+        position = self.index % len(self.paths) if self.loop else self.index
+        if position >= len(self.paths):
+            self.finished = True
+            return None
+        raw = cv2.imread(self.paths[position], cv2.IMREAD_COLOR)
+        if raw is None:
+            print(f"Could not read {self.paths[position]}, skipping")
+        self._due()
+        return raw
+
+
+def open_source(spec=0, realtime: bool = True, loop: bool = False, **camera_options) -> FrameSource:
+    """
+    Build a source from a camera index, a video file or an image directory.
+    `camera_options` (width, height, fps, fourcc, buffer_size, ...) only apply to devices.
+    """
+    if isinstance(spec, int) or (isinstance(spec, str) and spec.isdigit()):
+        return Camera(int(spec), **camera_options)
+    if os.path.isdir(spec):
+        return ImageDirectorySource(spec, realtime=realtime, loop=loop)
+    return VideoFileSource(spec, realtime=realtime, loop=loop)
+
+
 # from modules.servers.frame_parser import main_frame
 
 # class Camera:
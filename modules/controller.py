@@ -1,4 +1,15 @@
 from time import time
+from modules import metrics, tracing
+
+ACTION_SECONDS = metrics.histogram(
+    "controller_action_seconds", "Time spent in handle_gesture", ["gesture"]
+)
+ACTIONS = metrics.counter(
+    "controller_actions_total", "Player actions triggered by gestures", ["action"]
+)
+SUPPRESSED = metrics.counter(
+    "controller_cooldown_suppressed_total", "Gestures ignored because of the cooldown", ["action"]
+)
 
 
 class GestureController:
@@ -8,32 +19,44 @@ class GestureController:
         self.last_time = 0
         self.cooldown = cooldown
 
-    def handle_gesture(self, gesture):
-        now = time()
+    def handle_gesture(self, gesture, now=None):
+        label = gesture if isinstance(gesture, str) else (gesture[0] if gesture else "None")
+        with ACTION_SECONDS.labels(gesture=label).time():
+            self._handle_gesture(gesture, time() if now is None else now)
+
+    def _handle_gesture(self, gesture, now):
 
         if gesture == "Next":
             if self._can_trigger("Next", now):
-                self.music_player.next()
+                with tracing.span("player.next"):
+                    self.music_player.next()
                 self._update_state("Next", now)
 
         elif gesture == "Previous":
             if self._can_trigger("Previous", now):
-                self.music_player.prev()
+                with tracing.span("player.prev"):
+                    self.music_player.prev()
                 self._update_state("Previous", now)
 
         elif gesture == "Play":
             if self._can_trigger("Play", now):
-                self.music_player.play()
+                with tracing.span("player.play"):
+                    self.music_player.play()
                 self._update_state("Play", now)
 
         elif gesture == "Pause":
             if self._can_trigger("Pause", now):
-                self.music_player.stop()
+                with tracing.span("player.stop"):
+                    self.music_player.stop()
                 self._update_state("Pause", now)
 
     def _can_trigger(self, action, now):
-        return (action != self.last_action) or (now - self.last_time > self.cooldown)
+        allowed = (action != self.last_action) or (now - self.last_time > self.cooldown)
+        if not allowed:
+            SUPPRESSED.labels(action=action).inc()
+        return allowed
 
     def _update_state(self, action, now):
+        ACTIONS.labels(action=action).inc()
         self.last_action = action
         self.last_time = now
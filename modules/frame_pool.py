@@ -0,0 +1,83 @@
+"""
+Reusable frame buffers for the capture -> convert -> resize path.
+
+    pool = FramePool()
+    frame = pool.acquire((h, w, 3))        # reference count 1
+    cv2.flip(raw, 1, dst=frame)
+    pool.retain(frame)                     # a second consumer (e.g. the preview)
+    pool.release(frame)                    # ...each consumer releases when done
+    pool.release(frame)                    # count hits 0 -> buffer is reused
+
+Buffers are plain numpy arrays, keyed by (shape, dtype), so OpenCV can write
+into them with `dst=`. Releasing an array the pool didn't hand out is a no-op,
+so code paths can release unconditionally. At most `max_free` idle buffers are
+kept per shape; a resolution change simply lets the old ones be collected.
+"""
+import threading
+
+import numpy as np
+
+from modules import metrics
+
+ALLOCATIONS = metrics.counter("frame_pool_allocations_total", "New frame buffers allocated", ["pool"])
+REUSES = metrics.counter("frame_pool_reuses_total", "Frame buffers handed out again", ["pool"])
+IN_USE = metrics.gauge("frame_pool_in_use", "Frame buffers currently checked out", ["pool"])
+
+
+class FramePool:
+    def __init__(self, name: str = "frames", max_free: int = 4):
+        self.name = name
+        self.max_free = max_free
+        self._free = {}     # (shape, dtype) -> [array, ...]
+        self._in_use = {}   # id(array) -> [array, refcount]
+        self._lock = threading.Lock()
+        self._allocations = ALLOCATIONS.labels(pool=name)
+        self._reuses = REUSES.labels(pool=name)
+        self._gauge = IN_USE.labels(pool=name)
+
+    def acquire(self, shape, dtype=np.uint8) -> np.ndarray:
+        """Check out a writable buffer of `shape` (contents are undefined)."""
+        key = (tuple(shape), np.dtype(dtype).str)
+        with self._lock:
+            free = self._free.get(key)
+            array = free.pop() if free else None
+            if array is None:
+                array = np.empty(shape, dtype=dtype)
+                self._allocations.inc()
+            else:
+                self._reuses.inc()
+            self._in_use[id(array)] = [array, 1]
+            self._gauge.set(len(self._in_use))
+        return array
+
+    def retain(self, array: np.ndarray) -> np.ndarray:
+        """Add a consumer to a checked-out buffer."""
+        with self._lock:
+            entry = self._in_use.get(id(array))
+            if entry is not None:
+                entry[1] += 1
+        return array
+
+    def release(self, array: np.ndarray):
+        """Drop one consumer; the buffer returns to the pool when none are left."""
+        if array is None:
+            return
+        with self._lock:
+            entry = self._in_use.get(id(array))
+            if entry is None:
+                return
+            entry[1] -= 1
+            if entry[1] > 0:
+                return
+            del self._in_use[id(array)]
+            self._gauge.set(len(self._in_use))
+
+            # Someone may have marked it read-only (e.g. for MediaPipe)
+            array.flags.writeable = True
+            free = self._free.setdefault((array.shape, array.dtype.str), [])
+            if len(free) < self.max_free:
+                free.append(array)
+
+    def in_use(self) -> int:
+        with self._lock:
+            return len(self._in_use)
@@ -1,6 +1,9 @@
 from .tracker import HandTracker
+from .recording import SessionRecorder, SessionReplay
 
 
 __all__ = [
-    "HandTracker"
+    "HandTracker",
+    "SessionRecorder",
+    "SessionReplay",
 ]
@@ -1,4 +1,4 @@
-from time import time
+from typing import Optional
 from ..config import (
     DEFAULT_OPEN_DURATION,
     DEFAULT_VALIDITY_DURATION,
@@ -20,6 +20,7 @@ def detect_like_dislike(
     majority_ratio: float = LIKE_MAJORITY_RATIO,
     hold_time: float = LIKE_HOLD_TIME,
     cooldown: float = LIKE_COOLDOWN,
+    now: Optional[float] = None,
 ):
     """
     Detect Like (thumb up) or Dislike (thumb down) gestures after open palm.
@@ -37,7 +38,7 @@ def detect_like_dislike(
         """Return True if line AB intersects line CD"""
         return ccw(A, C, D) != ccw(B, C, D) and ccw(A, B, C) != ccw(A, B, D)
 
-    now = time()
+    now = tracker.current_time(now)
 
     # Check cooldown
     if hasattr(tracker, "_like_cooldown_until") and now < tracker._like_cooldown_until:
@@ -1,4 +1,4 @@
-from time import time
+from typing import Optional
 from ..config import (
     DEFAULT_OPEN_DURATION,
     DEFAULT_VALIDITY_DURATION,
@@ -16,12 +16,13 @@ def detect_reserve(
     cooldown: float = RESERVE_COOLDOWN,
     history_len: int = RESERVE_HISTORY_LEN,
     majority_ratio: float = RESERVE_MAJORITY_RATIO,
+    now: Optional[float] = None,
 ):
     """
     Detect reserved number gestures after open palm confirmation.
     Thumb must be closed (checked via line intersection).
     """
-    now = time()
+    now = tracker.current_time(now)
 
     # Check cooldown
     if (
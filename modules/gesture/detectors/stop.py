@@ -1,4 +1,4 @@
-from time import time
+from typing import Optional
 from ..config import (
     DEFAULT_OPEN_DURATION,
     DEFAULT_VALIDITY_DURATION,
@@ -13,6 +13,7 @@ def detect_stop(
     validity_duration: float = DEFAULT_VALIDITY_DURATION,
     fist_confirm: float = STOP_FIST_CONFIRM,
     movement_threshold: int = STOP_MOVEMENT_THRESHOLD,
+    now: Optional[float] = None,
 ):
     """
     Updated detect_stop that coordinates with was_open_recently().
@@ -21,7 +22,7 @@ def detect_stop(
     - movement_threshold resets the open-timer if the hand moves too much while open.
     - Returns "Pause" when open->fist gesture confirmed, otherwise None.
     """
-    now = time()
+    now = tracker.current_time(now)
 
     # Movement tracking while open: if moved too much, restart the open timer
     if tracker.landmarks and tracker.open_palm():
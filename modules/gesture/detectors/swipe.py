@@ -1,4 +1,4 @@
-from time import time
+from typing import Optional
 from ..config import (
     SWIPE_X_THRESHOLD,
     SWIPE_Y_TOLERANCE,
@@ -13,12 +13,13 @@ def detect_swipe(
     swipe_y_tolerance: int = SWIPE_Y_TOLERANCE,
     open_duration: float = DEFAULT_OPEN_DURATION,
     validity_duration: float = DEFAULT_VALIDITY_DURATION,
+    now: Optional[float] = None,
 ):
     """
     Detect horizontal swipe when hand is open.
     Returns: "Next", "Previous", or None
     """
-    now = time()
+    now = tracker.current_time(now)
 
     # Require recent confirmed open-palm before allowing swipe detection
     was_open = tracker.was_open_recently(
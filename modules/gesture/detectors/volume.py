@@ -1,4 +1,4 @@
-from time import time
+from typing import Optional
 from ..config import (
     DEFAULT_OPEN_DURATION,
     DEFAULT_VALIDITY_DURATION,
@@ -18,6 +18,7 @@ def detect_volume(
     pinch_threshold: int = VOLUME_PINCH_THRESHOLD,
     volume_scale: float = VOLUME_SCALE,
     max_x_movement: int = VOLUME_MAX_X_MOVEMENT,
+    now: Optional[float] = None,
 ):
     """
     Detect volume control gesture:
@@ -31,7 +32,7 @@ def detect_volume(
     Returns: ("VolumeUp", delta), ("VolumeDown", delta), or None
     where delta is proportional to movement.
     """
-    now = time()
+    now = tracker.current_time(now)
 
     # Check open palm confirmation
     was_open = tracker.was_open_recently(
@@ -0,0 +1,61 @@
+"""
+Landmark overlay drawn from HandTracker.landmarks, only for frames that are shown.
+
+Same look as mediapipe's draw_landmarks (white bones, red joints) but all
+bones of all hands go through one cv2.polylines call and joints are stamped
+with numpy fancy indexing instead of one cv2.circle call per point.
+"""
+from typing import List
+import cv2
+import numpy as np
+
+from .stateless import Point
+
+# MediaPipe hand topology (mp.solutions.hands.HAND_CONNECTIONS)
+HAND_CONNECTIONS = np.array(
+    [
+        (0, 1), (1, 2), (2, 3), (3, 4),          # thumb
+        (0, 5), (5, 6), (6, 7), (7, 8),          # index
+        (5, 9), (9, 10), (10, 11), (11, 12),     # middle
+        (9, 13), (13, 14), (14, 15), (15, 16),   # ring
+        (13, 17), (0, 17), (17, 18), (18, 19), (19, 20),  # pinky + palm
+    ],
+    dtype=np.intp,
+)
+
+LINE_COLOR = (224, 224, 224)  # BGR
+LINE_THICKNESS = 2
+JOINT_COLOR = (0, 0, 255)
+JOINT_RADIUS = 3
+
+
+def _disk_offsets(radius: int) -> np.ndarray:
+    r = np.arange(-radius, radius + 1)
+    dy, dx = np.meshgrid(r, r, indexing="ij")
+    mask = dx * dx + dy * dy <= radius * radius
+    return np.stack([dx[mask], dy[mask]], axis=1)
+
+
+_JOINT_STAMP = _disk_offsets(JOINT_RADIUS)
+
+
+def draw_landmarks(image: np.ndarray, hands: List[List[Point]]) -> np.ndarray:
+    """Draw every hand in `hands` (pixel landmarks) onto `image` in place."""
+    if not hands:
+        return image
+
+    points = np.asarray(hands, dtype=np.int32)  # (n_hands, 21, 2)
+    if points.ndim != 3 or points.shape[1] != 21:
+        return image
+
+    # Bones: (n_hands * n_connections, 2 endpoints, 2 coords) in one call
+    segments = points[:, HAND_CONNECTIONS].reshape(-1, 2, 2)
+    cv2.polylines(image, list(segments), False, LINE_COLOR, LINE_THICKNESS, cv2.LINE_AA)
+
+    # Joints: every landmark + every disk offset, clipped to the image
+    h, w = image.shape[:2]
+    stamp = (points.reshape(-1, 1, 2) + _JOINT_STAMP).reshape(-1, 2)
+    xs, ys = stamp[:, 0], stamp[:, 1]
+    inside = (xs >= 0) & (xs < w) & (ys >= 0) & (ys < h)
+    image[ys[inside], xs[inside]] = JOINT_COLOR
+    return image
@@ -0,0 +1,281 @@
+"""
+Landmark session recording and replay.
+
+A session file is a 16-byte header followed by fixed-size records, one per
+processed frame (timestamp, frame size, per-hand handedness and pixel
+landmarks, detected gesture). Records are only ever appended, so a file that
+is still being written (or was cut off by a crash) can be replayed up to its
+last complete record. Optionally, frames are JPEG-encoded into a sidecar
+`<path>.frames` file and referenced by offset/size from each record.
+
+    tracker = HandTracker(recorder=SessionRecorder("session.lmrec"))
+    ...
+    tracker.recorder.close()
+
+    replay = SessionReplay("session.lmrec")         # memory-mapped
+    for step in replay.feed(tracker, realtime=False):
+        print(step.timestamp, step.recorded, step.detected)
+
+Run `python -m modules.gesture.recording session.lmrec` to replay a file
+through a fresh HandTracker and compare detected against recorded gestures.
+"""
+import argparse
+import os
+import struct
+from time import perf_counter, sleep
+from typing import List, NamedTuple, Optional
+
+import cv2
+import numpy as np
+
+from .stateless import Point
+
+MAGIC = b"GCLMREC1"
+VERSION = 1
+HEADER = struct.Struct("<8sHHI")  # magic, version, max_hands, record size
+NUM_LANDMARKS = 21
+
+# Gesture names <-> codes stored in records (0 = nothing detected)
+GESTURES = [
+    None, "Play", "Pause", "Next", "Previous",
+    "VolumeUp", "VolumeDown", "Like", "Dislike",
+    "Reserve1", "Reserve2", "Reserve3",
+]
+_GESTURE_CODES = {name: code for code, name in enumerate(GESTURES)}
+
+HANDEDNESS = {None: 0, "Left": 1, "Right": 2}
+_HANDEDNESS_NAMES = {code: name for name, code in HANDEDNESS.items()}
+
+
+def record_dtype(max_hands: int) -> np.dtype:
+    return np.dtype(
+        [
+            ("timestamp", "<f8"),
+            ("frame_offset", "<u8"),   # into the .frames sidecar
+            ("frame_size", "<u4"),     # 0 = no frame stored
+            ("value", "<f4"),          # volume delta for VolumeUp/VolumeDown
+            ("width", "<u2"),
+            ("height", "<u2"),
+            ("n_hands", "u1"),
+            ("gesture", "u1"),
+            ("handedness", "u1", (max_hands,)),
+            ("landmarks", "<i2", (max_hands, NUM_LANDMARKS, 2)),
+        ],
+        align=False,
+    )
+
+
+def _encode_gesture(gesture):
+    if isinstance(gesture, tuple):
+        return _GESTURE_CODES.get(gesture[0], 0), float(gesture[1])
+    return _GESTURE_CODES.get(gesture, 0), 0.0
+
+
+def _decode_gesture(code: int, value: float):
+    name = GESTURES[code] if code < len(GESTURES) else None
+    if name in ("VolumeUp", "VolumeDown"):
+        return (name, float(value))
+    return name
+
+
+# -------------------------
+# Recording
+# -------------------------
+class SessionRecorder:
+    """
+    Appends one record per HandTracker.process() call.
+    The gesture is attached by detect_gesture(), so each record is written
+    when the next frame starts (or on close()).
+    """
+
+    def __init__(
+        self,
+        path: str,
+        max_hands: int = 2,
+        save_frames: bool = False,
+        jpeg_quality: int = 70,
+    ):
+        self.path = path
+        self.max_hands = max_hands
+        self.dtype = record_dtype(max_hands)
+        self.save_frames = save_frames
+        self.jpeg_quality = jpeg_quality
+
+        self._file = open(path, "ab")
+        if self._file.tell() == 0:
+            self._file.write(HEADER.pack(MAGIC, VERSION, max_hands, self.dtype.itemsize))
+        else:
+            _check_header(path, max_hands, self.dtype.itemsize)
+
+        self._frames = open(path + ".frames", "ab") if save_frames else None
+        self._pending = np.zeros(1, dtype=self.dtype)
+        self._has_pending = False
+
+    def add_frame(self, timestamp: float, frame, landmarks: List[List[Point]], handedness=None):
+        self._write_pending()
+
+        rec = self._pending[0]
+        rec["timestamp"] = timestamp
+        h, w = frame.shape[:2] if frame is not None else (0, 0)
+        rec["width"], rec["height"] = w, h
+
+        hands = landmarks[: self.max_hands]
+        rec["n_hands"] = len(hands)
+        rec["handedness"] = 0
+        rec["landmarks"] = 0
+        if hands:
+            rec["landmarks"][: len(hands)] = np.asarray(hands, dtype=np.int16)
+        for i, label in enumerate((handedness or [])[: self.max_hands]):
+            rec["handedness"][i] = HANDEDNESS.get(label, 0)
+
+        rec["gesture"], rec["value"] = 0, 0.0
+        rec["frame_offset"], rec["frame_size"] = 0, 0
+        if self._frames is not None and frame is not None:
+            ok, jpeg = cv2.imencode(".jpg", frame, [cv2.IMWRITE_JPEG_QUALITY, self.jpeg_quality])
+            if ok:
+                rec["frame_offset"] = self._frames.tell()
+                rec["frame_size"] = len(jpeg)
+                self._frames.write(jpeg.tobytes())
+
+        self._has_pending = True
+
+    def set_gesture(self, gesture):
+        if self._has_pending:
+            self._pending[0]["gesture"], self._pending[0]["value"] = _encode_gesture(gesture)
+
+    def _write_pending(self):
+        if self._has_pending:
+            self._file.write(self._pending.tobytes())
+            self._has_pending = False
+
+    def close(self):
+        self._write_pending()
+        self._file.close()
+        if self._frames is not None:
+            self._frames.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+        return False
+
+
+def _check_header(path: str, max_hands: int = None, record_size: int = None):
+    with open(path, "rb") as f:
+        magic, version, file_max_hands, file_record_size = HEADER.unpack(f.read(HEADER.size))
+    if magic != MAGIC or version != VERSION:
+        raise ValueError(f"{path} is not a landmark session file (version {VERSION})")
+    if max_hands is not None and (file_max_hands, file_record_size) != (max_hands, record_size):
+        raise ValueError(f"{path} was recorded with max_hands={file_max_hands}")
+    return file_max_hands
+
+
+# -------------------------
+# Replay
+# -------------------------
+class ReplayFrame(NamedTuple):
+    timestamp: float
+    width: int
+    height: int
+    landmarks: List[List[Point]]
+    handedness: List[Optional[str]]
+    recorded: object          # gesture stored in the file
+    detected: object = None   # gesture from the replaying tracker (feed() only)
+
+
+class SessionReplay:
+    """Memory-mapped, random-access view of a session file."""
+
+    def __init__(self, path: str):
+        self.path = path
+        max_hands = _check_header(path)
+        self.dtype = record_dtype(max_hands)
+
+        count = (os.path.getsize(path) - HEADER.size) // self.dtype.itemsize
+        self.records = (
+            np.memmap(path, dtype=self.dtype, mode="r", offset=HEADER.size, shape=(count,))
+            if count
+            else np.zeros(0, dtype=self.dtype)
+        )
+
+        frames_path = path + ".frames"
+        self._frames = (
+            np.memmap(frames_path, dtype=np.uint8, mode="r")
+            if os.path.exists(frames_path) and os.path.getsize(frames_path)
+            else None
+        )
+
+    def __len__(self):
+        return len(self.records)
+
+    def __getitem__(self, i) -> ReplayFrame:
+        rec = self.records[i]
+        n = int(rec["n_hands"])
+        return ReplayFrame(
+            timestamp=float(rec["timestamp"]),
+            width=int(rec["width"]),
+            height=int(rec["height"]),
+            landmarks=[[tuple(p) for p in hand] for hand in rec["landmarks"][:n].tolist()],
+            handedness=[_HANDEDNESS_NAMES.get(int(c)) for c in rec["handedness"][:n]],
+            recorded=_decode_gesture(int(rec["gesture"]), float(rec["value"])),
+        )
+
+    def __iter__(self):
+        for i in range(len(self)):
+            yield self[i]
+
+    def frame(self, i):
+        """Decode the stored frame for record `i`, or None if frames weren't saved."""
+        rec = self.records[i]
+        size = int(rec["frame_size"])
+        if self._frames is None or size == 0:
+            return None
+        offset = int(rec["frame_offset"])
+        return cv2.imdecode(self._frames[offset : offset + size], cv2.IMREAD_COLOR)
+
+    def feed(self, tracker, realtime: bool = False):
+        """
+        Push every record through `tracker` (no MediaPipe involved) and yield
+        ReplayFrames with the tracker's detect_gesture() result filled in.
+        realtime=True sleeps to reproduce the original frame timing.
+        """
+        start_wall = perf_counter()
+        start_ts = None
+        for item in self:
+            if realtime:
+                if start_ts is None:
+                    start_ts = item.timestamp
+                delay = (item.timestamp - start_ts) - (perf_counter() - start_wall)
+                if delay > 0:
+                    sleep(delay)
+
+            # Recorded timestamps drive all detector timing, so fast replay is deterministic
+            tracker.process_landmarks(item.landmarks, item.handedness, now=item.timestamp)
+            yield item._replace(detected=tracker.detect_gesture())
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Replay a landmark session through HandTracker")
+    parser.add_argument("path")
+    parser.add_argument("--realtime", action="store_true", help="replay at the recorded speed")
+    args = parser.parse_args(argv)
+
+    from .tracker import HandTracker
+
+    replay = SessionReplay(args.path)
+    tracker = HandTracker(sound_effects=False)
+    mismatches = 0
+    start = perf_counter()
+    for item in replay.feed(tracker, realtime=args.realtime):
+        if item.detected != item.recorded:
+            mismatches += 1
+        if item.detected is not None or item.recorded is not None:
+            print(f"{item.timestamp:.3f}  recorded={item.recorded}  detected={item.detected}")
+    elapsed = perf_counter() - start
+    print(f"{len(replay)} frames in {elapsed:.2f}s, {mismatches} mismatching gestures")
+
+
+if __name__ == "__main__":
+    main()
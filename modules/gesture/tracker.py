@@ -1,5 +1,6 @@
 from typing import List, Optional
 import cv2
+import numpy as np
 import mediapipe as mp
 from time import time
 from .config import (
@@ -34,6 +35,9 @@ from .stateless import (
     detect_static_gesture as _detect_static_gesture,
 )
 from .utils import palm_center, play_sound_effect
+from .overlay import draw_landmarks as _draw_landmarks
+from modules import metrics, tracing
+from modules.frame_pool import FramePool
 
 # Import refactored detector implementations
 from .detectors.stop import detect_stop as _detect_stop
@@ -43,11 +47,30 @@ from .detectors.reserve import detect_reserve as _detect_reserve
 from .detectors.like_dislike import detect_like_dislike as _detect_like_dislike
 
 
+PROCESS_SECONDS = metrics.histogram(
+    "tracker_process_seconds", "HandTracker.process time (color conversion + MediaPipe)"
+)
+FRAMES_PROCESSED = metrics.counter("tracker_frames_total", "Frames processed by HandTracker")
+HANDS_DETECTED = metrics.gauge("tracker_hands_detected", "Hands detected in the last frame")
+DETECTOR_SECONDS = metrics.histogram(
+    "detector_seconds", "Time spent in each gesture detector", ["detector"]
+)
+GESTURES_DETECTED = metrics.counter(
+    "gestures_detected_total", "Gestures returned by detect_gesture", ["gesture"]
+)
+_DETECTOR_TIMERS = {
+    name: DETECTOR_SECONDS.labels(detector=name)
+    for name in ("stop", "reserve", "like_dislike", "swipe", "volume")
+}
+_DETECTOR_SPANS = {name: f"detect_{name}" for name in _DETECTOR_TIMERS}
+
+
 class HandTracker:
     """
     Hand tracking and gesture recognition using MediaPipe.
     This is a stateful class: call process(frame) every frame, then call the
     detectors like detect_stop(), detect_swipe(), detect_gesture(), etc.
+    Recorded sessions can be fed with process_landmarks() instead.
     """
 
     def __init__(
@@ -55,22 +78,40 @@ class HandTracker:
         max_num_hands: int = 1,
         detection_confidence: float = DETECTION_AND_TRACING_CONFIDENCE,
         tracking_confidence: float = DETECTION_AND_TRACING_CONFIDENCE,
+        recorder=None,
+        clock=time,
+        sound_effects: bool = True,
+        pool: Optional[FramePool] = None,
     ):
-        # MediaPipe Hands setup
+        # MediaPipe Hands setup (the graph is built on first use, see `hands`)
         self.mp_hands = mp.solutions.hands
-        self.hands = self.mp_hands.Hands(
+        self._hands_options = dict(
             max_num_hands=max_num_hands,
             min_detection_confidence=detection_confidence,
             min_tracking_confidence=tracking_confidence,
         )
-        self.mp_draw = mp.solutions.drawing_utils
+        self._hands = None
+
+        # Optional SessionRecorder (see recording.py)
+        self.recorder = recorder
+
+        # RGB conversion buffers are reused between frames
+        self.pool = pool or FramePool("tracker")
+
+        # Time source. Every timing decision uses the timestamp of the current
+        # frame (self.now), so replays can pass recorded timestamps and run
+        # faster than real time with identical results.
+        self.clock = clock
+        self.now: Optional[float] = None
+        self.sound_effects = sound_effects  # off for offline replay
 
         # State
         self._history_len = HISTORY_FRAME
         self.landmarks: List[List[tuple[int, int]]] = []  # Detected landmarks of hands
+        self.handedness: List[Optional[str]] = []  # "Left"/"Right" per detected hand
         self.hand_center_positions: List[tuple[int, int]] = []  # Hand centers history
         self.trajectory: List[float] = []  # Angle trajectory for rotation detection
-        self._last_seen_time = time()  # The time the hand was last seen
+        self._last_seen_time = clock()  # The time the hand was last seen
         self._hand_state_history: List[str] = []  # History of open/fisted hands
 
         self._open_start_time: Optional[float] = None
@@ -87,12 +128,31 @@ class HandTracker:
             0.0  # timestamp until which was_open_recently returns True
         )
 
+    @property
+    def hands(self):
+        """MediaPipe Hands graph, created lazily so replay never builds it."""
+        if self._hands is None:
+            self._hands = self.mp_hands.Hands(**self._hands_options)
+        return self._hands
+
     # -------------------------
     # Processing
     # -------------------------
-    def process(self, frame):
+    def warm_up(self, width: int = 640, height: int = 480):
+        """
+        Run one blank frame through MediaPipe so graph initialization and model
+        loading happen now (e.g. in a background thread) instead of on the first
+        real frame. Tracker state is not touched.
         """
-        Detect hands in a frame, draw landmarks, and update state.
+        dummy = np.zeros((height, width, 3), dtype=np.uint8)
+        self.hands.process(dummy)
+
+    def process(self, frame, now: Optional[float] = None):
+        """
+        Detect hands in a frame and update state.
+        `now` is the frame's timestamp (defaults to self.clock()).
+        The frame is only read (it may be read-only); call draw_overlay()
+        on frames that are actually displayed.
 
         WRIST   0
         THUMB   1-4
@@ -101,32 +161,82 @@ class HandTracker:
         RING    13-16
         PINKY   17-20
         """
-        rgb = cv2.cvtColor(frame, cv2.COLOR_BGR2RGB)
-        results = self.hands.process(rgb)
-        self.landmarks = []
+        with PROCESS_SECONDS.time():
+            frame = self._process(frame, now)
+        FRAMES_PROCESSED.inc()
+        HANDS_DETECTED.set(len(self.landmarks))
+        return frame
 
+    def _process(self, frame, now):
+        rgb = self.pool.acquire(frame.shape, frame.dtype)
+        try:
+            with tracing.span("convert"):
+                cv2.cvtColor(frame, cv2.COLOR_BGR2RGB, dst=rgb)
+                # Read-only input lets MediaPipe wrap the array instead of copying it
+                rgb.flags.writeable = False
+            with tracing.span("mediapipe"):
+                results = self.hands.process(rgb)
+        finally:
+            # The graph is idle once process() returns, so the buffer can be reused
+            self.pool.release(rgb)
+
+        landmarks = []
+        handedness = []
         if results.multi_hand_landmarks:
             for hand_landmarks in results.multi_hand_landmarks:
-                # Draw landmarks
-                self.mp_draw.draw_landmarks(
-                    frame, hand_landmarks, self.mp_hands.HAND_CONNECTIONS
-                )
-
                 # Convert normalized coords to pixels
-                lm_list = self._extract_landmarks(frame, hand_landmarks)
-                self.landmarks.append(lm_list)
+                landmarks.append(self._extract_landmarks(frame, hand_landmarks))
+            for hand in results.multi_handedness or []:
+                handedness.append(hand.classification[0].label)
+
+        self._update_state(landmarks, handedness, now)
 
+        if self.recorder is not None:
+            with tracing.span("record"):
+                self.recorder.add_frame(self.now, frame, self.landmarks, self.handedness)
+
+        return frame
+
+    def process_landmarks(
+        self,
+        landmarks: List[List[tuple[int, int]]],
+        handedness=None,
+        now: Optional[float] = None,
+    ):
+        """
+        Update state from already-extracted pixel landmarks (e.g. a recorded
+        session) instead of running MediaPipe on a frame.
+        """
+        self._update_state([list(hand) for hand in landmarks], list(handedness or []), now)
+
+    def _update_state(self, landmarks, handedness, now):
+        self.now = now = self.clock() if now is None else now
+        self.landmarks = landmarks
+        self.handedness = handedness
+
+        if landmarks:
+            for lm_list in landmarks:
                 # Save hand center position
                 self._update_hand_position(lm_list)
 
             # Hand seen -> Update the time
-            self._last_seen_time = time()
+            self._last_seen_time = now
 
         else:
-            if time() - self._last_seen_time > CLEAR_DELAY:
+            if now - self._last_seen_time > CLEAR_DELAY:
                 self.hand_center_positions.clear()
 
-        return frame
+    def current_time(self, now: Optional[float] = None) -> float:
+        """`now` if given, else the current frame's timestamp, else the clock."""
+        if now is not None:
+            return now
+        if self.now is not None:
+            return self.now
+        return self.clock()
+
+    def draw_overlay(self, frame):
+        """Draw the landmarks from the last process() call onto `frame` in place."""
+        return _draw_landmarks(frame, self.landmarks)
 
     # -------------------------
     # Helpers
@@ -169,8 +279,7 @@ class HandTracker:
         - If no hand is present and confirmation expired -> returns False.
         - This method is self-contained (uses its own internal variables).
         """
-        if now is None:
-            now = time()
+        now = self.current_time(now)
 
         # If already confirmed and still within validity window => keep True
         if self._wo_confirmed and now <= self._wo_was_open_until:
@@ -201,7 +310,8 @@ class HandTracker:
                 self._wo_was_open_until = now + validity_duration
                 # reset start so we don't re-trigger repeatedly
                 self._wo_open_start = None
-                play_sound_effect("alert.mp3")
+                if self.sound_effects:
+                    play_sound_effect("alert.mp3")
                 return True
 
             # still accumulating open time, not yet confirmed
@@ -220,6 +330,7 @@ class HandTracker:
         validity_duration: float = DEFAULT_VALIDITY_DURATION,
         fist_confirm: float = STOP_FIST_CONFIRM,
         movement_threshold: int = STOP_MOVEMENT_THRESHOLD,
+        now: Optional[float] = None,
     ):
         """
         Updated detect_stop that coordinates with was_open_recently().
@@ -234,6 +345,7 @@ class HandTracker:
             validity_duration=validity_duration,
             fist_confirm=fist_confirm,
             movement_threshold=movement_threshold,
+            now=now,
         )
 
     def detect_swipe(
@@ -242,6 +354,7 @@ class HandTracker:
         validity_duration: float = DEFAULT_VALIDITY_DURATION,
         swipe_x_threshold: int = SWIPE_X_THRESHOLD,
         swipe_y_tolerance: int = SWIPE_Y_TOLERANCE,
+        now: Optional[float] = None,
     ):
         """
         Detect horizontal swipe when hand is open.
@@ -253,6 +366,7 @@ class HandTracker:
             validity_duration=validity_duration,
             swipe_x_threshold=swipe_x_threshold,
             swipe_y_tolerance=swipe_y_tolerance,
+            now=now,
         )
 
     def detect_volume(
@@ -262,6 +376,7 @@ class HandTracker:
         pinch_threshold: int = VOLUME_PINCH_THRESHOLD,
         volume_scale: float = VOLUME_SCALE,
         max_x_movement: int = VOLUME_MAX_X_MOVEMENT,
+        now: Optional[float] = None,
     ):
         """
         Detect volume control gesture:
@@ -282,6 +397,7 @@ class HandTracker:
             pinch_threshold=pinch_threshold,
             volume_scale=volume_scale,
             max_x_movement=max_x_movement,
+            now=now,
         )
 
     def detect_reserve(
@@ -291,6 +407,7 @@ class HandTracker:
         cooldown: float = RESERVE_COOLDOWN,
         history_len: int = RESERVE_HISTORY_LEN,
         majority_ratio: float = RESERVE_MAJORITY_RATIO,
+        now: Optional[float] = None,
     ):
         """
         Detect reserved number gestures after open palm confirmation.
@@ -303,6 +420,7 @@ class HandTracker:
             cooldown=cooldown,
             history_len=history_len,
             majority_ratio=majority_ratio,
+            now=now,
         )
 
     def detect_like_dislike(
@@ -314,6 +432,7 @@ class HandTracker:
         majority_ratio: float = LIKE_MAJORITY_RATIO,
         hold_time: float = LIKE_HOLD_TIME,
         cooldown: float = LIKE_COOLDOWN,
+        now: Optional[float] = None,
     ):
         """
         Detect Like (thumb up) or Dislike (thumb down) gestures after open palm.
@@ -332,9 +451,10 @@ class HandTracker:
             majority_ratio=majority_ratio,
             hold_time=hold_time,
             cooldown=cooldown,
+            now=now,
         )
 
-    def detect_gesture(self):
+    def detect_gesture(self, now: Optional[float] = None):
         """
         Unified gesture detector:
         Priority order:
@@ -345,30 +465,23 @@ class HandTracker:
         5. Volume (VolumeUp/VolumeDown)
 
         Returns: gesture string or ("VolumeUp/Down", delta) or None
+        `now` defaults to the timestamp passed to the last process() call.
         """
-        # 1. Stop
-        result = self.detect_stop()
-        if result:
-            return result
-
-        # 2. Reserve
-        result = self.detect_reserve()
-        if result:
-            return result
-
-        # 3. Like/Dislike
-        result = self.detect_like_dislike()
-        if result:
-            return result
-
-        # 4. Swipe
-        result = self.detect_swipe()
-        if result:
-            return result
-
-        # 5. Volume
-        result = self.detect_volume()
-        if result:
-            return result
+        # Checked in priority order; each detector is timed separately
+        for name, detector in (
+            ("stop", self.detect_stop),                  # 1. Stop
+            ("reserve", self.detect_reserve),            # 2. Reserve
+            ("like_dislike", self.detect_like_dislike),  # 3. Like/Dislike
+            ("swipe", self.detect_swipe),                # 4. Swipe
+            ("volume", self.detect_volume),              # 5. Volume
+        ):
+            with _DETECTOR_TIMERS[name].time(), tracing.span(_DETECTOR_SPANS[name]):
+                result = detector(now=now)
+            if result:
+                gesture = result[0] if isinstance(result, tuple) else result
+                GESTURES_DETECTED.labels(gesture=gesture).inc()
+                if self.recorder is not None:
+                    self.recorder.set_gesture(result)
+                return result
 
         return None
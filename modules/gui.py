@@ -5,9 +5,118 @@ from PyQt6.QtWidgets import (
     QHBoxLayout,
     QPushButton,
 )
-from PyQt6.QtGui import QImage, QPixmap
-from PyQt6.QtCore import Qt
-import cv2
+from PyQt6.QtGui import QImage, QPainter, QPixmap
+from PyQt6.QtCore import Qt, QRect, QSize, QTimer
+
+DEFAULT_REFRESH_RATE = 60.0  # Hz, used when the screen doesn't report one
+
+
+class FramePreview(QWidget):
+    """
+    Paints the latest BGR frame straight from a reusable buffer.
+
+    set_frame() only stores a reference; a timer running at the display refresh
+    rate copies the newest frame into the buffer and schedules one repaint, so
+    frames arriving faster than the screen can show them cost nothing.
+    Scaling happens in QPainter (no cv2.resize, no QPixmap conversion).
+    An optional overlay (e.g. hand landmarks) is drawn only on frames that get shown.
+    """
+
+    def __init__(self, max_width=640, max_height=480, parent=None):
+        super().__init__(parent)
+        self.max_width = max_width
+        self.max_height = max_height
+
+        self._pending = None   # newest frame not yet copied to the buffer
+        self._pending_pool = None  # FramePool the pending frame is retained in, if any
+        self._overlay = None   # optional callable drawing onto the buffer after the copy
+        self._buffer = None    # reused between frames while the shape is unchanged
+        self._image = None     # QImage wrapping self._buffer (no copy)
+        self._pixmap = None    # static image (QR code) shown when there are no frames
+
+        self._timer = QTimer(self)
+        self._timer.timeout.connect(self._flush)
+        self._timer.start(self._frame_interval_ms())
+
+    def _frame_interval_ms(self):
+        screen = self.screen()
+        rate = screen.refreshRate() if screen is not None else 0
+        return max(1, int(1000 / (rate or DEFAULT_REFRESH_RATE)))
+
+    def sizeHint(self):
+        return QSize(self.max_width, self.max_height)
+
+    # -------------------------
+    # Inputs
+    # -------------------------
+    def set_frame(self, frame, overlay=None, pool=None):
+        """`pool`: FramePool that owns `frame`; it's retained until copied or replaced."""
+        if pool is not None:
+            pool.retain(frame)
+        self._drop_pending()
+        self._pending = frame
+        self._pending_pool = pool
+        self._overlay = overlay
+
+    def set_pixmap(self, pixmap):
+        if pixmap is self._pixmap and self._image is None:
+            return
+        self._pixmap = pixmap
+        self._drop_pending()
+        self._image = None
+        self.update()
+
+    def _drop_pending(self):
+        if self._pending_pool is not None:
+            self._pending_pool.release(self._pending)
+        self._pending = None
+        self._pending_pool = None
+
+    # -------------------------
+    # Rendering
+    # -------------------------
+    def _flush(self):
+        import numpy as np  # deferred like cv2 was, so the window opens before numpy loads
+
+        frame = self._pending
+        if frame is None:
+            return
+
+        h, w, ch = frame.shape
+        if self._buffer is None or self._buffer.shape != frame.shape:
+            self._buffer = np.empty((h, w, ch), dtype=np.uint8)
+            self._image = None
+        np.copyto(self._buffer, frame)
+        self._drop_pending()
+        # Overlays go on our copy, so the source frame is never modified
+        if self._overlay is not None:
+            self._overlay(self._buffer)
+
+        if self._image is None:
+            self._image = QImage(
+                self._buffer.data, w, h, w * ch, QImage.Format.Format_BGR888
+            )
+        self.update()
+
+    def _target_rect(self, w, h):
+        # Fit inside the widget (and max size) keeping aspect ratio, never upscale
+        scale = min(
+            self.width() / w, self.height() / h,
+            self.max_width / w, self.max_height / h,
+            1.0,
+        )
+        tw, th = int(w * scale), int(h * scale)
+        return QRect((self.width() - tw) // 2, (self.height() - th) // 2, tw, th)
+
+    def paintEvent(self, event):
+        painter = QPainter(self)
+        if self._image is not None:
+            rect = self._target_rect(self._image.width(), self._image.height())
+            painter.drawImage(rect, self._image)
+        elif self._pixmap is not None:
+            rect = self._target_rect(self._pixmap.width(), self._pixmap.height())
+            painter.drawPixmap(rect, self._pixmap)
+        painter.end()
 
 
 class UI(QWidget):
@@ -21,8 +130,7 @@ class UI(QWidget):
         self.stop_server_button = QPushButton("Stop Server")
 
         # Image / QR display
-        self.image_label = QLabel()
-        self.image_label.setAlignment(Qt.AlignmentFlag.AlignCenter)
+        self.preview = FramePreview()
 
         # Status labels
         self.status_label = QLabel("Ready")
@@ -35,6 +143,7 @@ class UI(QWidget):
         self.server_status_label = QLabel("Server: stopped")
         self.server_status_label.setStyleSheet("font-size: 14px; color: red;")
         self.server_status_label.setAlignment(Qt.AlignmentFlag.AlignCenter)
+        self._server_running = False
 
         # Music control buttons
         self.play_button = QPushButton("▶️ Play")
@@ -52,7 +161,7 @@ class UI(QWidget):
         server_layout.addWidget(self.stop_server_button)
 
         layout = QVBoxLayout()
-        layout.addWidget(self.image_label)
+        layout.addWidget(self.preview, stretch=1)
         layout.addWidget(self.status_label)
         layout.addWidget(self.gesture_label)
         layout.addWidget(self.server_status_label)
@@ -62,38 +171,37 @@ class UI(QWidget):
         self.setLayout(layout)
 
     # نمایش فریم‌ها
-    def update_frame(self, frame, max_width=640, max_height=480):
-        h, w, ch = frame.shape
-
-        # محدود کردن اندازه با حفظ نسبت تصویر
-        scale_w = min(max_width / w, 1.0)
-        scale_h = min(max_height / h, 1.0)
-        scale = min(scale_w, scale_h)
-
-        new_w = int(w * scale)
-        new_h = int(h * scale)
-
-        resized_frame = cv2.resize(frame, (new_w, new_h))
-
-        bytes_per_line = ch * new_w
-        qt_image = QImage(resized_frame.data, new_w, new_h, bytes_per_line, QImage.Format.Format_BGR888)
-        pixmap = QPixmap.fromImage(qt_image)
-        self.image_label.setPixmap(pixmap)
+    def update_frame(self, frame, max_width=640, max_height=480, overlay=None, pool=None):
+        self.preview.max_width = max_width
+        self.preview.max_height = max_height
+        self.preview.set_frame(frame, overlay, pool)
 
+    # نمایش QR (وقتی فریمی نیست)
+    def show_pixmap(self, pixmap: QPixmap):
+        self.preview.set_pixmap(pixmap)
 
     # نمایش ژست
     def update_gesture(self, gesture_name):
-        self.gesture_label.setText(f"Gesture: {gesture_name}")
+        self._set_text(self.gesture_label, f"Gesture: {gesture_name}")
 
     # نمایش پیام وضعیت عمومی (مثل QR یا هیچ فریم)
     def update_status(self, message: str):
-        self.status_label.setText(message)
+        self._set_text(self.status_label, message)
 
     # نمایش وضعیت سرور
     def update_server_status(self, running: bool):
+        if running == self._server_running:
+            return
+        self._server_running = running
         if running:
             self.server_status_label.setText("Server: running")
             self.server_status_label.setStyleSheet("font-size: 14px; color: green;")
         else:
             self.server_status_label.setText("Server: stopped")
             self.server_status_label.setStyleSheet("font-size: 14px; color: red;")
+
+    @staticmethod
+    def _set_text(label: QLabel, text: str):
+        # setText re-lays out the label even for identical text
+        if label.text() != text:
+            label.setText(text)
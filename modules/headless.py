@@ -0,0 +1,142 @@
+"""
+Headless server mode for display-less machines.
+
+Runs frame ingest (/ws), hand tracking and gesture -> player dispatch
+without importing PyQt6 or opening any OpenCV window. The client whose
+stream is used is chosen through the control API:
+
+    GET    /api/clients
+    POST   /api/clients/{client_id}/select
+    DELETE /api/selection
+    WS     /ws/control   ({"select": "<client_id>"} / {"select": null})
+
+Run with:  python -m modules.headless [--player system] [--no-auto-select]
+"""
+import argparse
+import asyncio
+
+from modules import memprofile, tracing
+from modules.servers import shared_frame
+from modules.servers.ingest import latest_frames
+
+IDLE_SLEEP = 0.01  # seconds between polls when no new frame is available
+
+
+def _pick_client(auto_select: bool):
+    client_id = shared_frame.get_main_client_id()
+    if client_id is None and auto_select and latest_frames:
+        # Nobody chose a stream yet: follow the first client that sends frames
+        client_id = next(iter(latest_frames))
+        shared_frame.select_client(client_id)
+    return client_id
+
+
+def _step(tracker, controller, frame):
+    """Blocking part of one iteration (MediaPipe + player), run off the event loop."""
+    with tracing.frame():
+        with tracing.span("tracker.process"):
+            tracker.process(frame)
+        with tracing.span("detect_gesture"):
+            gesture = tracker.detect_gesture()
+        if gesture is not None:
+            print("Gesture:", gesture)
+        with tracing.span("dispatch", gesture=gesture):
+            controller.handle_gesture(gesture)
+    return gesture
+
+
+async def track_frames(tracker, controller, auto_select: bool = True):
+    last_frame = None
+    while True:
+        client_id = _pick_client(auto_select)
+        frame = latest_frames.get(client_id) if client_id is not None else None
+
+        # Only process frames we haven't seen yet
+        if frame is None or frame is last_frame:
+            await asyncio.sleep(IDLE_SLEEP)
+            continue
+
+        last_frame = frame
+        await asyncio.to_thread(_step, tracker, controller, frame)
+
+
+def _make_player(kind: str):
+    if kind == "system":
+        from modules.external_player.music_api_calls import MusicPlayer
+    else:
+        from modules.music_player import MusicPlayer
+    return MusicPlayer()
+
+
+async def run(
+    player: str = "local",
+    auto_select: bool = True,
+    watch_static: bool = False,
+    record: str = None,
+    record_frames: bool = False,
+):
+    from modules.gesture import HandTracker, SessionRecorder
+    from modules.controller import GestureController
+    from modules.servers.http_server import start_http_server
+
+    recorder = SessionRecorder(record, save_frames=record_frames) if record else None
+    tracker = HandTracker(recorder=recorder)
+    controller = GestureController(_make_player(player), cooldown=2.5)
+
+    tasks = [
+        asyncio.create_task(start_http_server(watch_static=watch_static)),
+        asyncio.create_task(track_frames(tracker, controller, auto_select=auto_select)),
+    ]
+    try:
+        await asyncio.gather(*tasks)
+    except asyncio.CancelledError:
+        pass
+    finally:
+        if recorder is not None:
+            recorder.close()
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Gesture control server without GUI")
+    parser.add_argument(
+        "--player",
+        choices=["local", "system"],
+        default="local",
+        help="local: play mp3s from music/ with pygame, system: send OS media keys",
+    )
+    parser.add_argument(
+        "--no-auto-select",
+        action="store_true",
+        help="wait for a client to be selected via the control API",
+    )
+    parser.add_argument(
+        "--watch-static", action="store_true", help="reload web/ assets when they change"
+    )
+    parser.add_argument("--record", metavar="PATH", help="record landmarks/gestures to a session file")
+    parser.add_argument(
+        "--record-frames", action="store_true", help="also store JPEG frames next to the session file"
+    )
+    parser.add_argument(
+        "--memprofile", type=int, metavar="N", help="print tracemalloc/RSS allocation reports every N frames"
+    )
+    args = parser.parse_args(argv)
+
+    if args.memprofile:
+        memprofile.enable(every=args.memprofile)
+
+    try:
+        asyncio.run(
+            run(
+                player=args.player,
+                auto_select=not args.no_auto_select,
+                watch_static=args.watch_static,
+                record=args.record,
+                record_frames=args.record_frames,
+            )
+        )
+    except KeyboardInterrupt:
+        print("\nShutting down gracefully...")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,13 +1,25 @@
+import itertools
 import sqlite3
+from contextlib import contextmanager
 from pathlib import Path
 from typing import Iterator
 
 DB_PATH = Path(__file__).resolve().parent / "music_player.db"
 
+# Per-connection settings. WAL lets the UI read while a scan is writing;
+# synchronous=NORMAL is durable across app crashes in WAL mode (only a power
+# cut can lose the last commits) and avoids an fsync per play-count update.
+PRAGMAS = {
+    "foreign_keys": "ON",
+    "synchronous": "NORMAL",
+    "busy_timeout": 5000,             # ms to wait for the writer lock instead of failing
+    "cache_size": -16000,             # KiB (negative) -> 16 MiB page cache
+    "mmap_size": 256 * 1024 * 1024,   # read pages straight from the OS page cache
+    "temp_store": "MEMORY",           # sorts / temp indexes never touch disk
+}
 
-SCHEMA = r"""
-PRAGMA foreign_keys = ON;
 
+SCHEMA = r"""
 CREATE TABLE IF NOT EXISTS music_directories (
     id INTEGER PRIMARY KEY AUTOINCREMENT,
     path TEXT NOT NULL UNIQUE,
@@ -24,26 +36,184 @@ CREATE TABLE IF NOT EXISTS musics (
     played_count INTEGER NOT NULL DEFAULT 0,
     is_liked INTEGER NOT NULL DEFAULT 0,
     dir_id INTEGER NOT NULL,
+    mtime_ns INTEGER NOT NULL DEFAULT 0,
+    inode INTEGER NOT NULL DEFAULT 0,
+    artist TEXT NOT NULL DEFAULT '',
+    album TEXT NOT NULL DEFAULT '',
+    folder TEXT NOT NULL DEFAULT '',
     FOREIGN KEY (dir_id) REFERENCES music_directories(id) ON DELETE CASCADE
 );
 
 CREATE INDEX IF NOT EXISTS idx_musics_dir_id ON musics(dir_id);
 """
 
-def get_conn() -> sqlite3.Connection:
-    first_time = not DB_PATH.exists()
-    conn = sqlite3.connect(DB_PATH)
+# Columns added after the first release: (table, column, definition)
+ADDED_COLUMNS = [
+    ("musics", "mtime_ns", "INTEGER NOT NULL DEFAULT 0"),
+    ("musics", "inode", "INTEGER NOT NULL DEFAULT 0"),
+]
+TAG_COLUMNS = [
+    ("musics", "artist", "TEXT NOT NULL DEFAULT ''"),
+    ("musics", "album", "TEXT NOT NULL DEFAULT ''"),
+    ("musics", "folder", "TEXT NOT NULL DEFAULT ''"),
+]
+
+# Full-text index over musics, kept in sync by triggers. External content
+# (content='musics') so the text isn't stored twice; the update trigger only
+# fires for indexed columns, not for play counts or likes. `folder` is the
+# path below the music directory (the shared root would match every track);
+# the unicode61 tokenizer splits it on / . _ - etc. into folder-name words.
+FTS_SCHEMA = [
+    """
+    CREATE VIRTUAL TABLE IF NOT EXISTS musics_fts USING fts5(
+        name, folder, artist, album,
+        content='musics', content_rowid='id',
+        tokenize='unicode61 remove_diacritics 2',
+        prefix='2 3'
+    )
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS musics_fts_insert AFTER INSERT ON musics BEGIN
+        INSERT INTO musics_fts(rowid, name, folder, artist, album)
+        VALUES (new.id, new.name, new.folder, new.artist, new.album);
+    END
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS musics_fts_delete AFTER DELETE ON musics BEGIN
+        INSERT INTO musics_fts(musics_fts, rowid, name, folder, artist, album)
+        VALUES ('delete', old.id, old.name, old.folder, old.artist, old.album);
+    END
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS musics_fts_update AFTER UPDATE OF name, folder, artist, album ON musics BEGIN
+        INSERT INTO musics_fts(musics_fts, rowid, name, folder, artist, album)
+        VALUES ('delete', old.id, old.name, old.folder, old.artist, old.album);
+        INSERT INTO musics_fts(rowid, name, folder, artist, album)
+        VALUES (new.id, new.name, new.folder, new.artist, new.album);
+    END
+    """,
+]
+
+
+# -------------------------
+# Migrations
+# -------------------------
+def _create_schema(conn: sqlite3.Connection):
+    # Statement by statement: executescript() would commit the migration transaction
+    for statement in SCHEMA.split(";"):
+        if statement.strip():
+            conn.execute(statement)
+
+
+def _add_missing_columns(conn: sqlite3.Connection, columns=ADDED_COLUMNS):
+    for table, column, definition in columns:
+        existing = {row[1] for row in conn.execute(f"PRAGMA table_info({table})")}
+        if column not in existing:
+            conn.execute(f"ALTER TABLE {table} ADD COLUMN {column} {definition}")
+
+
+def _index_musics_by_name(conn: sqlite3.Connection):
+    # Library view: WHERE dir_id=? ORDER BY name without a temp sort
+    conn.execute("CREATE INDEX IF NOT EXISTS idx_musics_dir_name ON musics(dir_id, name)")
+    conn.execute("DROP INDEX IF EXISTS idx_musics_dir_id")
+
+
+def _add_tag_columns(conn: sqlite3.Connection):
+    _add_missing_columns(conn, TAG_COLUMNS)
+    # Forget file stamps so the next sync re-reads every file and fills in tags / folders
+    conn.execute("UPDATE musics SET mtime_ns = 0")
+
+
+def _create_search_index(conn: sqlite3.Connection):
+    for statement in FTS_SCHEMA:
+        conn.execute(statement)
+    conn.execute("INSERT INTO musics_fts(musics_fts) VALUES ('rebuild')")
+
+
+# MIGRATIONS[i] brings a database from user_version i to i + 1. Only append;
+# databases created before versioning (user_version 0) go through all of them,
+# so every step must also work on a schema that already has its changes.
+MIGRATIONS = [
+    _create_schema,
+    _add_missing_columns,
+    _index_musics_by_name,
+    _add_tag_columns,
+    _create_search_index,
+]
+
+
+def migrate(conn: sqlite3.Connection):
+    version = conn.execute("PRAGMA user_version").fetchone()[0]
+    for target, step in enumerate(MIGRATIONS[version:], start=version + 1):
+        with transaction(conn, immediate=True):
+            step(conn)
+            conn.execute(f"PRAGMA user_version = {target}")
+
+
+# -------------------------
+# Connections
+# -------------------------
+def connect(path=DB_PATH, readonly: bool = False) -> sqlite3.Connection:
+    """
+    Open a configured connection. Read-only connections can't take the write
+    lock, so in WAL mode they never wait on (or block) the writer.
+    check_same_thread is off so a connection can be handed to a worker thread;
+    each connection must still be used by one thread at a time.
+    """
+    if readonly:
+        conn = sqlite3.connect(f"{Path(path).as_uri()}?mode=ro", uri=True, check_same_thread=False)
+    else:
+        conn = sqlite3.connect(path, check_same_thread=False)
     conn.row_factory = sqlite3.Row
-    if first_time:
-        with conn:
-            conn.executescript(SCHEMA)
+    for name, value in PRAGMAS.items():
+        conn.execute(f"PRAGMA {name} = {value}")
+    if readonly:
+        conn.execute("PRAGMA query_only = ON")
+    else:
+        # Stored in the file: only needs the writer to set it once
+        conn.execute("PRAGMA journal_mode = WAL")
+    return conn
+
+
+def get_conn(path=DB_PATH) -> sqlite3.Connection:
+    """The writer connection; creates / migrates the database."""
+    conn = connect(path)
+    migrate(conn)
     return conn
 
-def transaction(conn: sqlite3.Connection) -> Iterator[sqlite3.Connection]:
+
+def get_read_conn(path=DB_PATH) -> sqlite3.Connection:
+    """A reader for the UI. Open it after get_conn() so the database exists."""
+    return connect(path, readonly=True)
+
+
+_savepoints = itertools.count()
+
+
+@contextmanager
+def transaction(conn: sqlite3.Connection, immediate: bool = False) -> Iterator[sqlite3.Connection]:
+    """
+    with transaction(conn): ...  -> one BEGIN/COMMIT (ROLLBACK on error).
+    Nested use becomes a SAVEPOINT, so helpers can open their own transaction
+    and still be batched by a caller. immediate=True takes the write lock up
+    front (BEGIN IMMEDIATE) instead of on the first write.
+    """
+    if conn.in_transaction:
+        name = f"sp_{next(_savepoints)}"
+        conn.execute(f"SAVEPOINT {name}")
+        try:
+            yield conn
+        except BaseException:
+            conn.execute(f"ROLLBACK TO {name}")
+            conn.execute(f"RELEASE {name}")
+            raise
+        conn.execute(f"RELEASE {name}")
+        return
+
+    conn.execute("BEGIN IMMEDIATE" if immediate else "BEGIN")
     try:
-        conn.execute("BEGIN")
         yield conn
-        conn.commit()
-    except Exception:
+    except BaseException:
         conn.rollback()
         raise
+    conn.commit()
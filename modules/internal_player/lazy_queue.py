@@ -0,0 +1,79 @@
+"""
+A play queue backed by the database instead of a list.
+
+    queue = LazyQueue(conn, dir_id)
+    len(queue)        # one count(*) query
+    queue[12345]      # loads the page holding index 12345 (and remembers its key)
+
+Pages of PAGE_SIZE tracks are fetched with keyset queries on demand and
+at most `max_pages` are kept (least recently used are dropped), so memory
+doesn't grow with the directory. Next/prev mostly hit the cached page; a
+jump (shuffle, selecting a far row) finds the page's start key by walking
+the index from the nearest page already seen.
+"""
+from collections import OrderedDict
+from collections.abc import Sequence
+from typing import Callable, Dict, List, Optional, Tuple
+
+import modules.internal_player.repository as repo
+from modules.internal_player.models import Music
+
+MAX_PAGES = 8
+
+
+class LazyQueue(Sequence):
+    def __init__(
+        self,
+        conn,
+        dir_id: int,
+        page_size: int = repo.PAGE_SIZE,
+        max_pages: int = MAX_PAGES,
+        on_page: Optional[Callable[[List[Music]], None]] = None,
+    ):
+        self.conn = conn
+        self.dir_id = dir_id
+        self.page_size = page_size
+        self.max_pages = max_pages
+        self.on_page = on_page      # e.g. WriteBehind.apply, run on every loaded page
+        self._len = repo.count_musics_by_dir(conn, dir_id)
+        self._pages: "OrderedDict[int, List[Music]]" = OrderedDict()
+        # page number -> key of the track just before it (None = start of the directory)
+        self._keys: Dict[int, Optional[Tuple[str, int]]] = {0: None}
+
+    def __len__(self):
+        return self._len
+
+    def __getitem__(self, idx):
+        if isinstance(idx, slice):
+            return [self[i] for i in range(*idx.indices(self._len))]
+        if idx < 0:
+            idx += self._len
+        if not 0 <= idx < self._len:
+            raise IndexError("queue index out of range")
+        page = self._page(idx // self.page_size)
+        # IndexError here means the directory shrank since the count
+        return page[idx % self.page_size]
+
+    def _page(self, n: int) -> List[Music]:
+        page = self._pages.get(n)
+        if page is not None:
+            self._pages.move_to_end(n)
+            return page
+
+        page = repo.list_musics_page(self.conn, self.dir_id, self._start_key(n), self.page_size)
+        if self.on_page is not None:
+            self.on_page(page)
+        if len(page) == self.page_size:
+            self._keys[n + 1] = (page[-1].name, page[-1].id)
+        self._pages[n] = page
+        while len(self._pages) > self.max_pages:
+            self._pages.popitem(last=False)
+        return page
+
+    def _start_key(self, n: int) -> Optional[Tuple[str, int]]:
+        if n not in self._keys:
+            known = max(k for k in self._keys if k < n)
+            # Last track of page n - 1, counted from the start of page `known`
+            skip = (n - known) * self.page_size - 1
+            self._keys[n] = repo.music_key_at(self.conn, self.dir_id, self._keys[known], skip)
+        return self._keys[n]
@@ -1,15 +1,22 @@
 from __future__ import annotations
+import sys
+from array import array
+from collections.abc import Sequence
 from dataclasses import dataclass
-from typing import Optional
+from typing import List, Optional
 
-@dataclass
+# slots=True: no per-instance __dict__ (Music objects are built by the
+# hundred thousand for big libraries); MusicColumns is the compact form for
+# holding a whole directory
+
+@dataclass(slots=True)
 class MusicDirectory:
     id: Optional[int]
     path: str
     dir_name: str
     is_default: bool
 
-@dataclass
+@dataclass(slots=True)
 class Music:
     id: Optional[int]
     path: str
@@ -18,4 +25,69 @@ class Music:
     size: int      # bytes
     played_count: int
     is_liked: bool
-    dir_id: int
\ No newline at end of file
+    dir_id: int
+    # File identity from the last scan, used to skip unchanged files on rescan
+    mtime_ns: int = 0
+    inode: int = 0
+    # Tags (empty when the file has none), indexed for search
+    artist: str = ""
+    album: str = ""
+    folder: str = ""  # parent folder relative to the music directory ("" at its root)
+
+
+class MusicColumns(Sequence):
+    """
+    Column-oriented snapshot of many tracks (repository.load_music_columns):
+    numbers live in typed arrays (8 bytes each instead of a boxed int/float)
+    and strings in plain lists, with no object per track. Indexing builds a
+    Music on the fly, so changes to that object are not stored back.
+    """
+
+    __slots__ = (
+        "ids", "paths", "names", "lengths", "sizes", "played_counts", "liked",
+        "dir_ids", "mtime_ns", "inodes", "artists", "albums", "folders",
+    )
+
+    def __init__(self):
+        self.ids = array("q")
+        self.paths: List[str] = []
+        self.names: List[str] = []
+        self.lengths = array("d")
+        self.sizes = array("q")
+        self.played_counts = array("q")
+        self.liked = bytearray()
+        self.dir_ids = array("q")
+        self.mtime_ns = array("q")
+        self.inodes = array("q")
+        self.artists: List[str] = []
+        self.albums: List[str] = []
+        self.folders: List[str] = []
+
+    def append_row(self, row):
+        """Add one row in Music field order (repository.MUSIC_COLUMNS)."""
+        self.ids.append(row[0])
+        self.paths.append(row[1])
+        self.names.append(row[2])
+        self.lengths.append(row[3])
+        self.sizes.append(row[4])
+        self.played_counts.append(row[5])
+        self.liked.append(1 if row[6] else 0)
+        self.dir_ids.append(row[7])
+        self.mtime_ns.append(row[8])
+        self.inodes.append(row[9])
+        # Repeated across an album: keep one string object each
+        self.artists.append(sys.intern(row[10]))
+        self.albums.append(sys.intern(row[11]))
+        self.folders.append(sys.intern(row[12]))
+
+    def __len__(self):
+        return len(self.ids)
+
+    def __getitem__(self, idx):
+        if isinstance(idx, slice):
+            return [self[i] for i in range(*idx.indices(len(self)))]
+        return Music(
+            self.ids[idx], self.paths[idx], self.names[idx], self.lengths[idx], self.sizes[idx],
+            self.played_counts[idx], bool(self.liked[idx]), self.dir_ids[idx],
+            self.mtime_ns[idx], self.inodes[idx], self.artists[idx], self.albums[idx], self.folders[idx],
+        )
@@ -1,21 +1,21 @@
 import pygame
 import random
 from pathlib import Path
-from typing import List, Optional
+from typing import Optional, Sequence
 from modules.internal_player.models import Music
 
 class MusicPlayer:
     def __init__(self):
         pygame.mixer.init()
         self.current: Optional[Music] = None
-        self.queue: List[Music] = []
+        self.queue: Sequence[Music] = []  # a list, or a LazyQueue for whole directories
         self.index: int = -1
         self.volume: float = 0.5
         self.shuffle: bool = False
         self.repeat_mode: int = 0  # 0=off, 1=all, 2=one
         pygame.mixer.music.set_volume(self.volume)
 
-    def set_queue(self, musics: List[Music]):
+    def set_queue(self, musics: Sequence[Music]):
         self.queue = musics
         self.index = -1
 
@@ -96,9 +96,10 @@ class MusicPlayer:
         if not self.current:
             return None
         if not pygame.mixer.music.get_busy():
+            ended = self.current
             if self.repeat_mode == 2:  # repeat one
                 self.play_index(self.index)
             else:
                 self.next()
-            return self.current
+            return ended
         return None
@@ -1,6 +1,41 @@
+import re
 import sqlite3
-from typing import List, Optional
-from modules.internal_player.models import MusicDirectory, Music
+from collections import Counter
+from typing import Dict, Iterable, Iterator, List, Optional, Tuple
+from modules.internal_player.models import MusicColumns, MusicDirectory, Music
+
+# Rows per multi-row statement: 12 parameters each, under SQLite's historical 999 limit
+UPSERT_CHUNK = 80
+
+# bm25 weights for musics_fts columns (name, folder, artist, album)
+SEARCH_WEIGHTS = (10.0, 2.0, 5.0, 5.0)
+MIN_WORD = 2
+
+# Tracks per page for the paged directory queries
+PAGE_SIZE = 500
+
+# SELECT lists in model field order, so rows map to models positionally
+DIRECTORY_COLUMNS = "id, path, dir_name, is_default"
+MUSIC_COLUMNS = "id, path, name, length, size, played_count, is_liked, dir_id, mtime_ns, inode, artist, album, folder"
+
+
+# Row factories: set on the cursor, so sqlite3 hands over plain tuples and no
+# sqlite3.Row is built per row
+def _directory_row(cursor, row) -> MusicDirectory:
+    return MusicDirectory(row[0], row[1], row[2], bool(row[3]))
+
+
+def _music_row(cursor, row) -> Music:
+    return Music(
+        row[0], row[1], row[2], row[3], row[4], row[5], bool(row[6]), row[7], row[8], row[9],
+        row[10], row[11], row[12],
+    )
+
+
+def _select(conn, row_factory, sql: str, params=()) -> sqlite3.Cursor:
+    cur = conn.cursor()
+    cur.row_factory = row_factory
+    return cur.execute(sql, params)
 
 
 # Directories
@@ -20,25 +55,21 @@ def upsert_directory(conn, path: str, dir_name: str, is_default: bool = False) -
 
 
 def list_directories(conn) -> List[MusicDirectory]:
-    cur = conn.execute(
-        "SELECT id, path, dir_name, is_default FROM music_directories ORDER BY dir_name"
-    )
-    return [
-        MusicDirectory(id=row[0], path=row[1], dir_name=row[2], is_default=bool(row[3]))
-        for row in cur
-    ]
+    return _select(
+        conn, _directory_row, f"SELECT {DIRECTORY_COLUMNS} FROM music_directories ORDER BY dir_name"
+    ).fetchall()
+
+
+def get_directory(conn, dir_id: int) -> Optional[MusicDirectory]:
+    return _select(
+        conn, _directory_row, f"SELECT {DIRECTORY_COLUMNS} FROM music_directories WHERE id=?", (dir_id,)
+    ).fetchone()
 
 
 def get_default_directory(conn) -> Optional[MusicDirectory]:
-    cur = conn.execute(
-        "SELECT id, path, dir_name, is_default FROM music_directories WHERE is_default=1 LIMIT 1"
-    )
-    row = cur.fetchone()
-    return (
-        MusicDirectory(id=row[0], path=row[1], dir_name=row[2], is_default=bool(row[3]))
-        if row
-        else None
-    )
+    return _select(
+        conn, _directory_row, f"SELECT {DIRECTORY_COLUMNS} FROM music_directories WHERE is_default=1 LIMIT 1"
+    ).fetchone()
 
 
 def set_default_directory(conn, dir_id: int):
@@ -49,41 +80,221 @@ def set_default_directory(conn, dir_id: int):
 
 
 # Musics
+def _music_params(m: Music) -> tuple:
+    return (
+        m.path, m.name, m.length, m.size, m.played_count, int(m.is_liked),
+        m.dir_id, m.mtime_ns, m.inode, m.artist, m.album, m.folder,
+    )
+
+
 def upsert_music(conn, m: Music) -> int:
     cur = conn.execute(
         """
-        INSERT INTO musics (path, name, length, size, played_count, is_liked, dir_id)
-        VALUES (?, ?, ?, ?, ?, ?, ?)
+        INSERT INTO musics (path, name, length, size, played_count, is_liked, dir_id, mtime_ns, inode, artist, album, folder)
+        VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
         ON CONFLICT(path) DO UPDATE SET
             name=excluded.name,
             length=excluded.length,
             size=excluded.size,
-            dir_id=excluded.dir_id
+            dir_id=excluded.dir_id,
+            mtime_ns=excluded.mtime_ns,
+            inode=excluded.inode,
+            artist=excluded.artist,
+            album=excluded.album,
+            folder=excluded.folder
         RETURNING id
         """,
-        (m.path, m.name, m.length, m.size, m.played_count, int(m.is_liked), m.dir_id),
+        _music_params(m),
     )
     return int(cur.fetchone()[0])
 
 
-def list_musics_by_dir(conn, dir_id: int) -> List[Music]:
+def upsert_musics(conn, musics: Iterable[Music], chunk_size: int = UPSERT_CHUNK) -> Dict[str, int]:
+    """
+    Insert or update many musics; returns path -> id.
+    One multi-row INSERT ... RETURNING per chunk (executemany() drops RETURNING
+    rows). Run it inside transaction(conn) to commit the whole set at once.
+    """
+    ids: Dict[str, int] = {}
+    musics = list(musics)
+    for i in range(0, len(musics), chunk_size):
+        chunk = musics[i : i + chunk_size]
+        params = []
+        for m in chunk:
+            params.extend(_music_params(m))
+        cur = conn.execute(
+            f"""
+            INSERT INTO musics (path, name, length, size, played_count, is_liked, dir_id, mtime_ns, inode, artist, album, folder)
+            VALUES {",".join(["(?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)"] * len(chunk))}
+            ON CONFLICT(path) DO UPDATE SET
+                name=excluded.name,
+                length=excluded.length,
+                size=excluded.size,
+                dir_id=excluded.dir_id,
+                mtime_ns=excluded.mtime_ns,
+                inode=excluded.inode,
+                artist=excluded.artist,
+                album=excluded.album,
+            folder=excluded.folder
+            RETURNING path, id
+            """,
+            params,
+        )
+        ids.update((row[0], int(row[1])) for row in cur)
+    return ids
+
+
+def get_file_index(conn, dir_id: int) -> Dict[str, Tuple[int, int, int]]:
+    """path -> (size, mtime_ns, inode) for every music of a directory."""
     cur = conn.execute(
-        "SELECT id, path, name, length, size, played_count, is_liked, dir_id FROM musics WHERE dir_id=? ORDER BY name",
-        (dir_id,),
+        "SELECT path, size, mtime_ns, inode FROM musics WHERE dir_id=?", (dir_id,)
     )
-    return [
-        Music(
-            id=row[0],
-            path=row[1],
-            name=row[2],
-            length=row[3],
-            size=row[4],
-            played_count=row[5],
-            is_liked=bool(row[6]),
-            dir_id=row[7],
+    return {row[0]: (row[1], row[2], row[3]) for row in cur}
+
+
+def delete_musics_by_path(conn, paths) -> int:
+    paths = list(paths)
+    removed = 0
+    # Chunked to stay under SQLite's bound-parameter limit
+    for i in range(0, len(paths), 500):
+        chunk = paths[i : i + 500]
+        cur = conn.execute(
+            f"DELETE FROM musics WHERE path IN ({','.join('?' * len(chunk))})", chunk
+        )
+        removed += cur.rowcount
+    return removed
+
+
+def get_musics_by_paths(conn, paths: Iterable[str]) -> List[Music]:
+    paths = list(paths)
+    musics: List[Music] = []
+    for i in range(0, len(paths), 500):
+        chunk = paths[i : i + 500]
+        musics.extend(
+            _select(
+                conn, _music_row,
+                f"SELECT {MUSIC_COLUMNS} FROM musics WHERE path IN ({','.join('?' * len(chunk))})",
+                chunk,
+            )
         )
-        for row in cur
-    ]
+    return musics
+
+
+def delete_musics_under(conn, folder: str) -> int:
+    """Delete every music below `folder` (a posix path); a range scan on the path index."""
+    prefix = folder.rstrip("/") + "/"
+    # "0" sorts right after "/", so [prefix, prefix[:-1] + "0") is exactly the paths starting with prefix
+    cur = conn.execute("DELETE FROM musics WHERE path >= ? AND path < ?", (prefix, prefix[:-1] + "0"))
+    return cur.rowcount
+
+
+def list_musics_by_dir(conn, dir_id: int) -> List[Music]:
+    return _select(
+        conn, _music_row, f"SELECT {MUSIC_COLUMNS} FROM musics WHERE dir_id=? ORDER BY name, id", (dir_id,)
+    ).fetchall()
+
+
+def load_music_columns(conn, dir_id: int) -> MusicColumns:
+    """
+    A whole directory as a MusicColumns (ordered like list_musics_by_dir).
+    Less than half the memory of list_musics_by_dir(), at a similar load time.
+    """
+    columns = MusicColumns()
+    for row in _select(
+        conn, None, f"SELECT {MUSIC_COLUMNS} FROM musics WHERE dir_id=? ORDER BY name, id", (dir_id,)
+    ):
+        columns.append_row(row)
+    return columns
+
+
+# Paged access for big directories. Tracks are ordered by (name, id), which
+# idx_musics_dir_name (dir_id, name [, rowid]) serves without sorting; a page
+# continues after the (name, id) key of the previous page's last track, so
+# every page costs the same however deep into the library it is.
+def count_musics_by_dir(conn, dir_id: int) -> int:
+    return conn.execute("SELECT count(*) FROM musics WHERE dir_id=?", (dir_id,)).fetchone()[0]
+
+
+def list_musics_page(
+    conn, dir_id: int, after: Optional[Tuple[str, int]] = None, limit: int = PAGE_SIZE
+) -> List[Music]:
+    """Up to `limit` tracks following the key `after` ((name, id) of the last track seen; None = from the start)."""
+    if after is None:
+        cur = _select(
+            conn, _music_row,
+            f"SELECT {MUSIC_COLUMNS} FROM musics WHERE dir_id=? ORDER BY name, id LIMIT ?",
+            (dir_id, limit),
+        )
+    else:
+        cur = _select(
+            conn, _music_row,
+            f"SELECT {MUSIC_COLUMNS} FROM musics WHERE dir_id=? AND (name, id) > (?, ?) ORDER BY name, id LIMIT ?",
+            (dir_id, after[0], after[1], limit),
+        )
+    return cur.fetchall()
+
+
+def iter_musics_by_dir(conn, dir_id: int, page_size: int = PAGE_SIZE) -> Iterator[Music]:
+    """list_musics_by_dir() one page at a time; only one page is in memory."""
+    after = None
+    while True:
+        page = list_musics_page(conn, dir_id, after, page_size)
+        yield from page
+        if len(page) < page_size:
+            return
+        after = (page[-1].name, page[-1].id)
+
+
+def music_key_at(conn, dir_id: int, after: Optional[Tuple[str, int]], skip: int) -> Optional[Tuple[str, int]]:
+    """
+    (name, id) of the track `skip` positions past `after`, or None past the end.
+    Walks the index only (no row reads), so jumping to a far page is cheap.
+    """
+    if after is None:
+        row = conn.execute(
+            "SELECT name, id FROM musics WHERE dir_id=? ORDER BY name, id LIMIT 1 OFFSET ?", (dir_id, skip)
+        ).fetchone()
+    else:
+        row = conn.execute(
+            "SELECT name, id FROM musics WHERE dir_id=? AND (name, id) > (?, ?) ORDER BY name, id LIMIT 1 OFFSET ?",
+            (dir_id, after[0], after[1], skip),
+        ).fetchone()
+    return (row[0], row[1]) if row else None
+
+
+def fts_query(text: str) -> str:
+    """
+    User input -> FTS5 MATCH expression: every word must match as a prefix,
+    in any column ("beat abb" -> "beat"* "abb"*). Quoting each word keeps
+    FTS syntax characters in the input from being interpreted. One-letter
+    words are dropped: they match most of a big library and only cost time.
+    """
+    return " ".join(f'"{word}"*' for word in re.findall(r"\w+", text) if len(word) >= MIN_WORD)
+
+
+def search_musics(conn, text: str, dir_id: Optional[int] = None, limit: int = 200) -> List[Music]:
+    """Best matches for `text` (prefix match on name, folder, artist, album), by bm25 rank."""
+    query = fts_query(text)
+    if not query:
+        return []
+    where = "musics_fts MATCH ?"
+    params: list = [query]
+    if dir_id is not None:
+        where += " AND m.dir_id = ?"
+        params.append(dir_id)
+    cur = _select(
+        conn,
+        _music_row,
+        f"""
+        SELECT {", ".join("m." + c for c in MUSIC_COLUMNS.split(", "))}
+        FROM musics_fts JOIN musics m ON m.id = musics_fts.rowid
+        WHERE {where}
+        ORDER BY bm25(musics_fts, {", ".join(map(str, SEARCH_WEIGHTS))})
+        LIMIT ?
+        """,
+        (*params, limit),
+    )
+    return cur.fetchall()
 
 
 def increment_play_count(conn, music_id: int):
@@ -92,25 +303,23 @@ def increment_play_count(conn, music_id: int):
     )
 
 
+def increment_play_counts(conn, music_ids: Iterable[int]):
+    """Bulk increment_play_count; an id listed n times is incremented by n."""
+    conn.executemany(
+        "UPDATE musics SET played_count = played_count + ? WHERE id=?",
+        [(n, music_id) for music_id, n in Counter(music_ids).items()],
+    )
+
+
 def set_like(conn, music_id: int, liked: bool):
     conn.execute("UPDATE musics SET is_liked=? WHERE id=?", (int(liked), music_id))
 
 
-def get_music_by_id(conn, music_id: int) -> Optional[Music]:
-    cur = conn.execute(
-        "SELECT id, path, name, length, size, played_count, is_liked, dir_id FROM musics WHERE id=?",
-        (music_id,),
-    )
-    row = cur.fetchone()
-    if not row:
-        return None
-    return Music(
-        id=row[0],
-        path=row[1],
-        name=row[2],
-        length=row[3],
-        size=row[4],
-        played_count=row[5],
-        is_liked=bool(row[6]),
-        dir_id=row[7],
+def set_likes(conn, music_ids: Iterable[int], liked: bool):
+    conn.executemany(
+        "UPDATE musics SET is_liked=? WHERE id=?", [(int(liked), music_id) for music_id in music_ids]
     )
+
+
+def get_music_by_id(conn, music_id: int) -> Optional[Music]:
+    return _select(conn, _music_row, f"SELECT {MUSIC_COLUMNS} FROM musics WHERE id=?", (music_id,)).fetchone()
@@ -1,34 +1,264 @@
+import asyncio
+import os
+import threading
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, ThreadPoolExecutor, wait
+from dataclasses import dataclass, replace
 from pathlib import Path
-from typing import List
+from typing import AsyncIterator, Callable, Dict, Iterator, List, NamedTuple, Optional, Set, Tuple
 from mutagen import File as MutagenFile
 from modules.internal_player.models import Music
-from modules.internal_player.utils import is_audio_file
+from modules.internal_player.utils import AUDIO_EXTS
 
-def scan_directory(dir_path: str, dir_id: int) -> List[Music]:
-    base = Path(dir_path)
-    items: List[Music] = []
-    if not base.exists() or not base.is_dir():
-        return items
+BATCH_SIZE = 200     # tracks per yielded batch
+MAX_WORKERS = 8      # metadata readers (I/O bound, so threads by default)
+
+
+@dataclass
+class ScanProgress:
+    found: int = 0          # audio files discovered so far
+    scanned: int = 0        # files whose metadata has been read
+    unchanged: int = 0      # files skipped because size/mtime/inode match `known`
+    walking: bool = True    # False once the directory walk is complete
+    current: str = ""       # last file scanned
+
+
+class AudioFile(NamedTuple):
+    path: str
+    size: int
+    mtime_ns: int
+    inode: int
 
-    for p in sorted(base.iterdir()):
-        if not p.is_file() or not is_audio_file(p):
+    def same_as(self, known: Tuple[int, int, int]) -> bool:
+        """True if (size, mtime_ns, inode) from the DB still describes this file."""
+        size, mtime_ns, inode = known
+        # Some network filesystems report no (or unstable) inodes
+        same_inode = not inode or not self.inode or inode == self.inode
+        return size == self.size and mtime_ns == self.mtime_ns and same_inode
+
+
+def iter_audio_files(dir_path: str, failed_dirs: Optional[List[str]] = None) -> Iterator[AudioFile]:
+    """
+    Recursively yield audio files under `dir_path`, in name order per
+    directory. Uses os.scandir so file type, inode and stat come from the
+    directory listing / cached stat instead of extra syscalls per file.
+    Symlinked directories are not followed (avoids loops on NAS shares).
+    Directories that can't be listed are appended to `failed_dirs`.
+    """
+    stack = [dir_path]
+    while stack:
+        current = stack.pop()
+        try:
+            with os.scandir(current) as it:
+                entries = sorted(it, key=lambda e: e.name)
+        except OSError:
+            if failed_dirs is not None:
+                failed_dirs.append(current)
             continue
-        length = 0.0
+
+        subdirs = []
+        for entry in entries:
+            try:
+                if entry.is_dir(follow_symlinks=False):
+                    subdirs.append(entry.path)
+                elif entry.is_file() and os.path.splitext(entry.name)[1].lower() in AUDIO_EXTS:
+                    st = entry.stat()
+                    yield AudioFile(entry.path, st.st_size, st.st_mtime_ns, entry.inode())
+            except OSError:
+                continue
+        # Reversed so the stack pops them in name order
+        stack.extend(reversed(subdirs))
+
+
+def read_metadata(path: str) -> Tuple[float, str, str]:
+    """(length in seconds, artist, album) from the file's headers/tags; 0 / "" when unreadable."""
+    try:
+        mf = MutagenFile(path, easy=True)
+    except Exception:
+        return 0.0, "", ""
+    if mf is None:
+        return 0.0, "", ""
+
+    length = float(getattr(mf.info, 'length', 0) or 0) if mf.info is not None else 0.0
+
+    def tag(key):
         try:
-            mf = MutagenFile(p.as_posix())
-            if mf is not None and mf.info is not None and getattr(mf.info, 'length', None):
-                length = float(mf.info.length)
+            values = mf.tags.get(key) if mf.tags is not None else None
         except Exception:
-            length = 0.0
-        size = p.stat().st_size
-        items.append(Music(
-            id=None,
-            path=p.as_posix(),
-            name=p.stem,
-            length=length,
-            size=size,
-            played_count=0,
-            is_liked=False,
-            dir_id=dir_id,
-        ))
+            return ""
+        return str(values[0]).strip() if values else ""
+
+    return length, tag("artist"), tag("album")
+
+
+def read_length(path: str) -> float:
+    """Track length in seconds from the file's tags/headers (0 if unreadable)."""
+    return read_metadata(path)[0]
+
+
+def make_music(f: AudioFile, metadata: Tuple[float, str, str], dir_id: int, dir_path: str) -> Music:
+    length, artist, album = metadata
+    p = Path(f.path)
+    folder = os.path.relpath(os.path.dirname(f.path), dir_path)
+    return Music(
+        id=None,
+        path=p.as_posix(),
+        name=p.stem,
+        length=length,
+        size=f.size,
+        played_count=0,
+        is_liked=False,
+        dir_id=dir_id,
+        mtime_ns=f.mtime_ns,
+        inode=f.inode,
+        artist=artist,
+        album=album,
+        folder="" if folder == "." else Path(folder).as_posix(),
+    )
+
+
+def scan_directory_batches(
+    dir_path: str,
+    dir_id: int,
+    batch_size: int = BATCH_SIZE,
+    workers: int = MAX_WORKERS,
+    use_processes: bool = False,
+    progress: Optional[Callable[[ScanProgress], None]] = None,
+    cancel: Optional[threading.Event] = None,
+    known: Optional[Dict[str, Tuple[int, int, int]]] = None,
+    seen: Optional[Set[str]] = None,
+    failed_dirs: Optional[List[str]] = None,
+) -> Iterator[List[Music]]:
+    """
+    Walk `dir_path` recursively and read metadata in a worker pool, yielding
+    lists of up to `batch_size` Music items as they complete (not in path order).
+    At most a few batches of files are in flight, so memory stays flat on huge
+    libraries. `progress` is called from the calling thread after every batch.
+
+    Incremental mode: files whose path is in `known` (path -> size, mtime_ns,
+    inode) with matching values are not opened or yielded. Every path found
+    is added to `seen`, so the caller can tell which known files vanished.
+    """
+    if not os.path.isdir(dir_path):
+        return
+
+    state = ScanProgress()
+    max_in_flight = max(workers * 4, batch_size)
+    executor_cls = ProcessPoolExecutor if use_processes else ThreadPoolExecutor
+    with executor_cls(max_workers=workers) as pool:
+        pending = {}  # future -> AudioFile
+        batch: List[Music] = []
+        files = iter_audio_files(dir_path, failed_dirs)
+
+        def collect(done):
+            for future in done:
+                f = pending.pop(future)
+                batch.append(make_music(f, future.result(), dir_id, dir_path))
+                state.scanned += 1
+                state.current = f.path
+
+        while True:
+            if cancel is not None and cancel.is_set():
+                for future in pending:
+                    future.cancel()
+                return
+
+            # Keep the pool fed while the walk is still producing files
+            while state.walking and len(pending) < max_in_flight:
+                f = next(files, None)
+                if f is None:
+                    state.walking = False
+                    break
+                state.found += 1
+                path = Path(f.path).as_posix()
+                if seen is not None:
+                    seen.add(path)
+                if known is not None and path in known and f.same_as(known[path]):
+                    state.unchanged += 1
+                    if progress is not None and state.unchanged % 1000 == 0:
+                        progress(state)
+                    continue
+                pending[pool.submit(read_metadata, f.path)] = f
+
+            if not pending:
+                break
+            done, _ = wait(pending, timeout=0.5, return_when=FIRST_COMPLETED)
+            collect(done)
+
+            if len(batch) >= batch_size or (not pending and not state.walking):
+                if progress is not None:
+                    progress(state)
+                if batch:
+                    yield batch
+                    batch = []
+
+        # Final state, also when every file was unchanged and nothing was yielded
+        if progress is not None:
+            progress(state)
+        if batch:
+            yield batch
+
+
+def scan_directory(dir_path: str, dir_id: int) -> List[Music]:
+    """All audio files under `dir_path` (recursive), sorted by path."""
+    items: List[Music] = []
+    for batch in scan_directory_batches(dir_path, dir_id):
+        items.extend(batch)
+    items.sort(key=lambda m: m.path)
     return items
+
+
+async def scan_directory_async(
+    dir_path: str,
+    dir_id: int,
+    progress: Optional[Callable[[ScanProgress], None]] = None,
+    **options,
+) -> AsyncIterator[List[Music]]:
+    """
+    scan_directory_batches() run in a background thread, for use from the UI
+    event loop: `async for batch in scan_directory_async(...)`. `progress` is
+    called on the event loop. Stopping the iteration cancels the scan.
+    """
+    loop = asyncio.get_running_loop()
+    queue: asyncio.Queue = asyncio.Queue()
+    slots = threading.Semaphore(4)  # batches handed over but not yet consumed
+    cancel = threading.Event()
+    done = object()
+
+    def post(callback, *args):
+        try:
+            loop.call_soon_threadsafe(callback, *args)
+        except RuntimeError:  # loop already closed
+            cancel.set()
+
+    def report(state: ScanProgress):
+        if progress is not None:
+            post(progress, replace(state))
+
+    def hand_over(item):
+        while not slots.acquire(timeout=0.2):
+            if cancel.is_set():
+                return
+        post(queue.put_nowait, item)
+
+    def worker():
+        try:
+            for batch in scan_directory_batches(dir_path, dir_id, progress=report, cancel=cancel, **options):
+                hand_over(batch)
+        except Exception as e:
+            post(queue.put_nowait, e)
+        finally:
+            post(queue.put_nowait, done)
+
+    thread = threading.Thread(target=worker, daemon=True, name="library-scan")
+    thread.start()
+    try:
+        while True:
+            item = await queue.get()
+            if item is done:
+                break
+            if isinstance(item, Exception):
+                raise item
+            slots.release()
+            yield item
+    finally:
+        cancel.set()
@@ -0,0 +1,111 @@
+"""
+Incremental library sync: bring the `musics` rows of one directory in line
+with what is on disk.
+
+    result = sync_directory(conn, "/music", dir_id)
+    result = await sync_directory_async(conn, "/music", dir_id, progress=cb)
+
+Unchanged files (same size, mtime and inode as stored) are never opened;
+new or changed files are re-parsed; rows of files that no longer exist are
+deleted. Each batch is written in its own transaction, so an interrupted
+sync keeps everything stored so far and the next sync resumes cheaply.
+"""
+import os
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Callable, List, Optional, Set
+
+import modules.internal_player.repository as repo
+from modules.internal_player.db import transaction
+from modules.internal_player.models import Music
+from modules.internal_player.scanner import (
+    ScanProgress,
+    scan_directory_async,
+    scan_directory_batches,
+)
+
+
+@dataclass
+class SyncResult:
+    written: int = 0      # new or changed files (re-parsed and upserted)
+    unchanged: int = 0
+    removed: int = 0
+
+
+def _store(conn, musics: List[Music], result: SyncResult):
+    with transaction(conn):
+        repo.upsert_musics(conn, musics)
+    result.written += len(musics)
+
+
+def _remove_vanished(conn, known, seen: Set[str], failed_dirs: List[str], result):
+    # Files under folders we couldn't list may still exist: keep their rows
+    failed = tuple(Path(d).as_posix().rstrip("/") + "/" for d in failed_dirs)
+    vanished = [p for p in known.keys() - seen if not p.startswith(failed)]
+    if vanished:
+        with transaction(conn):
+            result.removed = repo.delete_musics_by_path(conn, vanished)
+
+
+def sync_directory(
+    conn,
+    dir_path: str,
+    dir_id: int,
+    progress: Optional[Callable[[ScanProgress], None]] = None,
+    **options,
+) -> SyncResult:
+    result = SyncResult()
+    if not os.path.isdir(dir_path):
+        # Unmounted drive / share: don't treat the whole library as deleted
+        return result
+
+    known = repo.get_file_index(conn, dir_id)
+    seen: Set[str] = set()
+    failed_dirs: List[str] = []
+    last = ScanProgress()
+
+    def track(state):
+        last.unchanged = state.unchanged
+        if progress is not None:
+            progress(state)
+
+    for musics in scan_directory_batches(
+        dir_path, dir_id, progress=track, known=known, seen=seen, failed_dirs=failed_dirs, **options
+    ):
+        _store(conn, musics, result)
+
+    result.unchanged = last.unchanged
+    _remove_vanished(conn, known, seen, failed_dirs, result)
+    return result
+
+
+async def sync_directory_async(
+    conn,
+    dir_path: str,
+    dir_id: int,
+    progress: Optional[Callable[[ScanProgress], None]] = None,
+    **options,
+) -> SyncResult:
+    """sync_directory() for the UI loop: scanning runs in the background, writes on the caller's thread."""
+    result = SyncResult()
+    if not os.path.isdir(dir_path):
+        return result
+
+    known = repo.get_file_index(conn, dir_id)
+    seen: Set[str] = set()
+    failed_dirs: List[str] = []
+    last = ScanProgress()
+
+    def track(state):
+        last.unchanged = state.unchanged
+        if progress is not None:
+            progress(state)
+
+    async for musics in scan_directory_async(
+        dir_path, dir_id, progress=track, known=known, seen=seen, failed_dirs=failed_dirs, **options
+    ):
+        _store(conn, musics, result)
+
+    result.unchanged = last.unchanged
+    _remove_vanished(conn, known, seen, failed_dirs, result)
+    return result
@@ -3,17 +3,36 @@ import toga
 from toga.style import Pack
 from toga.style.pack import COLUMN, ROW
 from pathlib import Path
-from modules.internal_player.db import get_conn
+from modules.internal_player.db import get_conn, get_read_conn, transaction
+from modules.internal_player.lazy_queue import LazyQueue
 import modules.internal_player.repository as repo
 from modules.internal_player.player import MusicPlayer
-from modules.internal_player.scanner import scan_directory
-from modules.internal_player.utils import format_seconds, format_size
+from modules.internal_player.sync import sync_directory_async
+from modules.internal_player.view_model import ACCESSORS, HEADINGS, MusicTableModel
+from modules.internal_player.watcher import LibraryWatcher
+from modules.internal_player.write_behind import WriteBehind
+
+SEARCH_DEBOUNCE = 0.15  # seconds of no typing before the search runs
 
 
 class MusicApp(toga.App):
     def startup(self):
+        # Writes (likes, play counts, scans) on self.conn; table loads on self.reader,
+        # which WAL keeps unblocked while a sync is writing
         self.conn = get_conn()
+        self.reader = get_read_conn()
+        # Play counts and likes are written in the background (see write_behind.py)
+        self.writes = WriteBehind()
+        # Folder changes on disk are applied by a watcher thread and handed to the loop
+        loop = asyncio.get_event_loop()
+        self.watcher = LibraryWatcher(
+            on_change=lambda change: loop.call_soon_threadsafe(self.on_library_change, change)
+        )
+        self.watcher.start()
         self.player = MusicPlayer()
+        self.dir_id = None          # directory shown in the table
+        self._search_handle = None
+        self._fill_task = None
 
         # Main box
         self.main_box = toga.Box(style=Pack(direction=COLUMN, padding=10))
@@ -21,17 +40,29 @@ class MusicApp(toga.App):
         # Directory controls
         self.dir_select_button = toga.Button("Add Folder", on_press=self.add_folder)
         self.dir_set_default_button = toga.Button("Set as Default", on_press=self.set_default_folder)
+        self.dir_rescan_button = toga.Button("Rescan", on_press=self.rescan_folder)
+        self.scan_label = toga.Label("")
+        self.search_input = toga.TextInput(
+            placeholder="Search name, artist, album, folder",
+            on_change=self.on_search_change,
+            style=Pack(flex=1)
+        )
         self.dir_box = toga.Box(
-            children=[self.dir_select_button, self.dir_set_default_button],
+            children=[
+                self.dir_select_button, self.dir_set_default_button, self.dir_rescan_button,
+                self.scan_label, self.search_input
+            ],
             style=Pack(direction=ROW, padding=5)
         )
 
         # Music table
         self.music_table = toga.Table(
-            headings=["Name", "Length", "Size", "Liked", "Played"],
+            headings=HEADINGS,
+            accessors=ACCESSORS,
             on_select=self.on_select_music,
             style=Pack(flex=1)
         )
+        self.table_model = MusicTableModel(self.music_table)
 
         # Controls
         self.play_button = toga.Button("Play", on_press=self.on_play)
@@ -72,36 +103,58 @@ class MusicApp(toga.App):
             await asyncio.sleep(1)
             ended = self.player.on_song_end()
             if ended:
-                repo.increment_play_count(self.conn, ended.id)
-                self.load_musics(ended.dir_id)
+                ended.played_count += 1
+                self.writes.increment_play_count(ended.id)
+                self.table_model.update(ended)
 
     def load_default_dir(self):
-        d = repo.get_default_directory(self.conn)
+        d = repo.get_default_directory(self.reader)
         if d:
             self.load_musics(d.id)
 
-    def load_musics(self, dir_id: int):
-        musics = repo.list_musics_by_dir(self.conn, dir_id)
-        self.music_table.data.clear()
-        for m in musics:
-            self.music_table.data.append(
-(                m.name,
-                format_seconds(m.length),
-                format_size(m.size),
-                "❤️" if m.is_liked else "",
-                str(m.played_count))
-            )
+    def load_musics(self, dir_id=None):
+        # Shows the search results within the directory while the search box has text
+        self.dir_id = dir_id
+        text = self.search_input.value
+        if repo.fts_query(text):
+            musics = repo.search_musics(self.reader, text, dir_id=dir_id)
+            self.writes.apply(musics)
+        elif dir_id is not None:
+            # Pages are loaded as the table / player reach them
+            musics = LazyQueue(self.reader, dir_id, on_page=self.writes.apply)
+        else:
+            musics = []
+        self.table_model.set_musics(musics)
         self.player.set_queue(musics)
 
+        if self._fill_task is not None:
+            self._fill_task.cancel()
+        self._fill_task = asyncio.ensure_future(self.fill_table())
+
+    async def fill_table(self):
+        # Rest of the rows after the first paint, a page per loop iteration
+        while self.table_model.load_more():
+            await asyncio.sleep(0)
+
+    def on_search_change(self, widget):
+        # Debounced: only the last keystroke of a burst queries the index
+        if self._search_handle is not None:
+            self._search_handle.cancel()
+        self._search_handle = asyncio.get_event_loop().call_later(SEARCH_DEBOUNCE, self.run_search)
+
+    def run_search(self):
+        self._search_handle = None
+        self.load_musics(self.dir_id)
+
     def on_select_music(self, widget, row=None):
         if row is None:
             return
 
-        try:
-            idx = self.music_table.data.index(row)
-            self.player.play_index(idx)
-        except ValueError:
+        idx = self.table_model.index_of(row)
+        if idx is None:
             print("Row not found in table data")
+            return
+        self.player.play_index(idx)
 
 
     def on_play(self, widget): self.player.play()
@@ -118,25 +171,65 @@ class MusicApp(toga.App):
         label = ["Off", "All", "One"][mode]
         self.repeat_button.label = f"Repeat: {label}"
     def on_like(self, widget):
-        if self.player.current:
-            new_val = not self.player.current.is_liked
-            repo.set_like(self.conn, self.player.current.id, new_val)
-            self.load_musics(self.player.current.dir_id)
+        current = self.player.current
+        if current:
+            current.is_liked = not current.is_liked
+            self.writes.set_like(current.id, current.is_liked)
+            self.table_model.update(current)
 
     async def add_folder(self, widget):
         folder = await self.main_window.select_folder_dialog("Select Music Folder")
         if folder:
-            dir_id = repo.upsert_directory(self.conn, folder, Path(folder).name)
-            musics = scan_directory(folder, dir_id)
-            for m in musics:
-                repo.upsert_music(self.conn, m)
-            self.load_musics(dir_id)
+            with transaction(self.conn):
+                dir_id = repo.upsert_directory(self.conn, folder, Path(folder).name)
+            await self.sync_folder(str(folder), dir_id)
+            self.watcher.add_directory(dir_id, str(folder))
+
+    async def rescan_folder(self, widget):
+        if self.dir_id is None:
+            return
+        d = repo.get_directory(self.reader, self.dir_id)
+        if d:
+            await self.sync_folder(d.path, d.id)
+
+    async def sync_folder(self, folder: str, dir_id: int):
+        # Walk + metadata run in a background pool; only new/changed files are parsed
+        self.dir_select_button.enabled = False
+        self.dir_rescan_button.enabled = False
+        try:
+            result = await sync_directory_async(self.conn, folder, dir_id, progress=self.on_scan_progress)
+            print(f"Synced {folder}: {result}")
+        finally:
+            self.dir_select_button.enabled = True
+            self.dir_rescan_button.enabled = True
+            self.scan_label.text = ""
+        self.load_musics(dir_id)
+
+    def on_library_change(self, change):
+        if change.dir_id != self.dir_id:
+            return
+        if change.reload:
+            self.load_musics(self.dir_id)
+            return
+        self.writes.apply(change.updated)
+        for m in change.updated:
+            self.table_model.update(m)
+
+    def on_scan_progress(self, progress):
+        total = f"{progress.found}+" if progress.walking else str(progress.found)
+        done = progress.scanned + progress.unchanged
+        self.scan_label.text = f"Scanning {done}/{total}"
 
     async def set_default_folder(self, widget):
-        if not self.player.queue:
+        if self.dir_id is None:
             return
-        dir_id = self.player.queue[0].dir_id
-        repo.set_default_directory(self.conn, dir_id)
+        with transaction(self.conn):
+            repo.set_default_directory(self.conn, self.dir_id)
+
+    def on_exit(self):
+        self.watcher.stop()
+        self.writes.close()
+        return True
 
 
 def main():
@@ -0,0 +1,85 @@
+"""
+View-model between the Music list and the Toga table.
+
+    model = MusicTableModel(table)
+    model.set_musics(musics)      # rebuild (or diff, if it's the same tracks)
+    while model.load_more(): ...  # append the rest, a page per call
+    model.update(music)           # one row, only the cells that changed
+    idx = model.index_of(row)     # selected row -> queue index, O(1)
+
+Each row keeps its Music object in `row._music` (underscore attributes
+don't trigger a redraw), and an id -> index map replaces the linear
+`data.index(row)` / queue scans. Toga redraws on every row append and every
+attribute assignment, so rebuilds replace the data source in one assignment
+and updates skip cells whose text is unchanged.
+
+`musics` may be a LazyQueue: only the first FIRST_ROWS rows are built up
+front, so the first paint doesn't depend on the directory size.
+"""
+from typing import Dict, Optional, Sequence
+
+from modules.internal_player.models import Music
+from modules.internal_player.utils import format_seconds, format_size
+
+HEADINGS = ["Name", "Length", "Size", "Liked", "Played"]
+ACCESSORS = ["name", "length", "size", "liked", "played"]
+FIRST_ROWS = 200
+MORE_ROWS = 500
+
+
+def row_values(m: Music) -> dict:
+    return {
+        "name": m.name,
+        "length": format_seconds(m.length),
+        "size": format_size(m.size),
+        "liked": "❤️" if m.is_liked else "",
+        "played": str(m.played_count),
+    }
+
+
+class MusicTableModel:
+    def __init__(self, table):
+        self.table = table
+        self.musics: Sequence[Music] = []
+        self._index: Dict[int, int] = {}  # music id -> row index, for rows shown so far
+
+    def set_musics(self, musics: Sequence[Music]):
+        same = (
+            isinstance(musics, list)
+            and isinstance(self.musics, list)
+            and [m.id for m in musics] == [m.id for m in self.musics]
+        )
+        if same:
+            # Same tracks in the same order (e.g. reload after a rescan): patch cells
+            for row, m in zip(self.table.data, musics):
+                row._music = m
+                self._apply(row, m)
+        else:
+            first = musics[:FIRST_ROWS]
+            self.table.data = [{**row_values(m), "_music": m} for m in first]
+            self._index = {m.id: i for i, m in enumerate(first)}
+        self.musics = musics
+
+    def load_more(self, count: int = MORE_ROWS) -> bool:
+        """Append the next `count` rows; False once every track is shown."""
+        start = len(self._index)
+        for i, m in enumerate(self.musics[start : start + count], start):
+            self._index[m.id] = i
+            self.table.data.append({**row_values(m), "_music": m})
+        return len(self._index) < len(self.musics)
+
+    def update(self, music: Music):
+        """Refresh the row showing `music` after its fields changed."""
+        idx = self._index.get(music.id)
+        if idx is not None:
+            self._apply(self.table.data[idx], music)
+
+    def index_of(self, row) -> Optional[int]:
+        music = getattr(row, "_music", None)
+        return self._index.get(music.id) if music is not None else None
+
+    @staticmethod
+    def _apply(row, m: Music):
+        for accessor, value in row_values(m).items():
+            if getattr(row, accessor, None) != value:
+                setattr(row, accessor, value)
@@ -0,0 +1,299 @@
+"""
+Keeps the library database in step with the music folders while the app runs.
+
+    watcher = LibraryWatcher(on_change=callback)   # callback(LibraryChange), watcher thread
+    watcher.start()                                # watches every music_directories row
+    watcher.add_directory(dir_id, path)            # e.g. after "Add Folder"
+    watcher.stop()
+
+Local folders are watched with inotify (the optional inotify_simple package,
+a pure-Python ctypes binding). Events are collected until the folder has been
+quiet for DEBOUNCE seconds (at most MAX_DELAY), then only the touched files
+are stat'ed, re-read if they changed, and upserted / deleted in one
+transaction.
+
+inotify only sees changes made through the local kernel, so folders on
+network filesystems (NFS, SMB, sshfs, ...) - or everything, when inotify
+isn't available - fall back to an incremental sync every POLL_INTERVAL
+seconds. Changes made while the app isn't running are picked up by Rescan.
+"""
+import errno
+import os
+import queue
+import threading
+import time
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Callable, Dict, List, Optional, Set, Tuple
+
+import modules.internal_player.repository as repo
+from modules.internal_player.db import DB_PATH, connect, transaction
+from modules.internal_player.models import Music
+from modules.internal_player.scanner import AudioFile, iter_audio_files, make_music, read_metadata
+from modules.internal_player.sync import sync_directory
+from modules.internal_player.utils import AUDIO_EXTS
+
+try:
+    from inotify_simple import INotify, flags
+except ImportError:  # inotify_simple is optional (and Linux only); folders are polled instead
+    INotify = flags = None
+
+DEBOUNCE = 2.0          # seconds without events before changes are applied
+MAX_DELAY = 10.0        # ... but never hold changes longer than this during a long copy
+POLL_INTERVAL = 300.0   # seconds between incremental syncs of polled folders
+
+NETWORK_FS = {"nfs", "nfs4", "cifs", "smb3", "smbfs", "fuse.sshfs", "9p", "afs", "ceph", "glusterfs"}
+
+
+@dataclass
+class LibraryChange:
+    dir_id: int
+    updated: List[Music] = field(default_factory=list)  # existing tracks whose rows changed
+    reload: bool = False    # tracks were added or removed, so listing positions shifted
+
+
+def is_network_fs(path: str) -> bool:
+    """True if `path` is on a network filesystem (per /proc/self/mounts; False elsewhere)."""
+    try:
+        with open("/proc/self/mounts") as f:
+            mounts = [line.split()[1:3] for line in f]
+    except OSError:
+        return False
+    path = os.path.realpath(path)
+    best, fstype = "", ""
+    for mount_point, kind in mounts:
+        mount_point = mount_point.replace("\\040", " ")
+        inside = path == mount_point or path.startswith(mount_point.rstrip("/") + "/")
+        if inside and len(mount_point) > len(best):
+            best, fstype = mount_point, kind
+    return fstype in NETWORK_FS
+
+
+class _Pending:
+    """Paths touched in one music directory since its changes were last applied."""
+
+    def __init__(self):
+        self.files: Set[str] = set()
+        self.new_dirs: Set[str] = set()
+        self.gone_dirs: Set[str] = set()
+        self.resync = False           # event queue overflowed: fall back to a sync
+        self.first = self.last = time.monotonic()
+
+    def touch(self):
+        self.last = time.monotonic()
+
+
+class LibraryWatcher:
+    def __init__(
+        self,
+        on_change: Optional[Callable[[LibraryChange], None]] = None,
+        path=DB_PATH,
+        poll_interval: float = POLL_INTERVAL,
+    ):
+        self.on_change = on_change
+        self.path = path
+        self.poll_interval = poll_interval
+        self._commands: "queue.SimpleQueue" = queue.SimpleQueue()
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, daemon=True, name="library-watcher")
+        self._inotify = None
+        self._roots: Dict[int, str] = {}                  # dir_id -> music directory
+        self._wds: Dict[int, Tuple[int, str]] = {}        # watch descriptor -> (dir_id, folder)
+        self._polled: Dict[int, float] = {}               # dir_id -> next poll (monotonic)
+        self._pending: Dict[int, _Pending] = {}
+
+    def start(self):
+        self._thread.start()
+
+    def stop(self, timeout: float = 5.0):
+        self._stop.set()
+        self._thread.join(timeout)
+
+    def add_directory(self, dir_id: int, path: str):
+        """Start watching one more music directory (thread-safe)."""
+        self._commands.put((dir_id, str(path)))
+
+    # -------------------------
+    # Watcher thread
+    # -------------------------
+    def _run(self):
+        conn = connect(self.path)
+        if INotify is not None:
+            try:
+                self._inotify = INotify()
+            except OSError as e:
+                print(f"inotify unavailable, polling music folders: {e}")
+        try:
+            for d in repo.list_directories(conn):
+                self._watch(d.id, d.path)
+            while not self._stop.is_set():
+                while not self._commands.empty():
+                    self._watch(*self._commands.get())
+                self._read_events()
+                self._apply_due(conn)
+                self._poll_due(conn)
+        finally:
+            if self._inotify is not None:
+                self._inotify.close()
+            conn.close()
+
+    def _watch(self, dir_id: int, root: str):
+        if dir_id in self._roots or not os.path.isdir(root):
+            return
+        self._roots[dir_id] = root
+        if self._inotify is None or is_network_fs(root):
+            self._polled[dir_id] = time.monotonic() + self.poll_interval
+            return
+        try:
+            self._watch_tree(dir_id, root)
+        except OSError as e:
+            # Typically ENOSPC: fs.inotify.max_user_watches is too low for this library
+            print(f"Can't watch {root} ({e}), polling it instead")
+            self._unwatch(lambda owner, _folder: owner == dir_id)
+            self._polled[dir_id] = time.monotonic() + self.poll_interval
+
+    def _watch_tree(self, dir_id: int, top: str):
+        mask = (
+            flags.CREATE | flags.CLOSE_WRITE | flags.DELETE | flags.MOVED_FROM | flags.MOVED_TO
+            | flags.DELETE_SELF | flags.ONLYDIR
+        )
+        for folder, _dirs, _files in os.walk(top):
+            try:
+                wd = self._inotify.add_watch(folder, mask)
+            except OSError as e:
+                if e.errno == errno.ENOENT:  # removed while we were walking
+                    continue
+                raise
+            self._wds[wd] = (dir_id, folder)
+
+    def _unwatch(self, match: Callable[[int, str], bool]):
+        """Remove the watches whose (dir_id, folder) satisfy `match`."""
+        for wd, (owner, folder) in list(self._wds.items()):
+            if match(owner, folder):
+                del self._wds[wd]
+                try:
+                    self._inotify.rm_watch(wd)
+                except OSError:
+                    pass
+
+    def _read_events(self):
+        if self._inotify is None:
+            self._stop.wait(0.5)
+            return
+        for event in self._inotify.read(timeout=500):
+            if event.mask & flags.Q_OVERFLOW:
+                for dir_id in self._roots:
+                    if dir_id not in self._polled:
+                        self._pending_for(dir_id).resync = True
+                continue
+            if event.mask & flags.IGNORED:  # watch removed (folder deleted)
+                self._wds.pop(event.wd, None)
+                continue
+            owner = self._wds.get(event.wd)
+            if owner is None or not event.name:
+                continue
+            dir_id, folder = owner
+            path = os.path.join(folder, event.name)
+            pending = self._pending_for(dir_id)
+            if event.mask & flags.ISDIR:
+                if event.mask & (flags.CREATE | flags.MOVED_TO):
+                    pending.new_dirs.add(path)
+                    pending.gone_dirs.discard(path)
+                    try:
+                        self._watch_tree(dir_id, path)
+                    except OSError as e:
+                        print(f"Can't watch {path}: {e}")
+                elif event.mask & (flags.DELETE | flags.MOVED_FROM):
+                    pending.gone_dirs.add(path)
+                    pending.new_dirs.discard(path)
+                    if event.mask & flags.MOVED_FROM:
+                        # Still exists elsewhere, so its watches stay; a MOVED_TO re-adds them
+                        prefix = path + "/"
+                        self._unwatch(lambda _owner, folder: folder == path or folder.startswith(prefix))
+            elif os.path.splitext(event.name)[1].lower() in AUDIO_EXTS:
+                pending.files.add(path)
+
+    def _pending_for(self, dir_id: int) -> _Pending:
+        pending = self._pending.get(dir_id)
+        if pending is None:
+            pending = self._pending[dir_id] = _Pending()
+        pending.touch()
+        return pending
+
+    def _apply_due(self, conn):
+        now = time.monotonic()
+        for dir_id, pending in list(self._pending.items()):
+            if now - pending.last >= DEBOUNCE or now - pending.first >= MAX_DELAY:
+                del self._pending[dir_id]
+                try:
+                    change = self._apply(conn, dir_id, pending)
+                except Exception as e:
+                    print(f"Library update for {self._roots[dir_id]} failed: {e}")
+                    continue
+                self._notify(change)
+
+    def _poll_due(self, conn):
+        now = time.monotonic()
+        for dir_id, due in list(self._polled.items()):
+            if now < due:
+                continue
+            self._polled[dir_id] = now + self.poll_interval
+            try:
+                result = sync_directory(conn, self._roots[dir_id], dir_id)
+            except Exception as e:
+                print(f"Polling {self._roots[dir_id]} failed: {e}")
+                continue
+            if result.written or result.removed:
+                self._notify(LibraryChange(dir_id, reload=True))
+
+    def _notify(self, change: Optional[LibraryChange]):
+        if change is not None and self.on_change is not None and (change.updated or change.reload):
+            self.on_change(change)
+
+    # -------------------------
+    # Applying changes
+    # -------------------------
+    def _apply(self, conn, dir_id: int, pending: _Pending) -> Optional[LibraryChange]:
+        root = self._roots[dir_id]
+        if pending.resync:
+            result = sync_directory(conn, root, dir_id)
+            return LibraryChange(dir_id, reload=bool(result.written or result.removed))
+
+        # Files inside new folders are covered by walking the folder
+        candidates: Dict[str, AudioFile] = {}
+        for folder in pending.new_dirs:
+            for f in iter_audio_files(folder):
+                candidates[Path(f.path).as_posix()] = f
+        gone: List[str] = []
+        for path in pending.files:
+            key = Path(path).as_posix()
+            if key in candidates or any(key.startswith(Path(d).as_posix() + "/") for d in pending.gone_dirs):
+                continue
+            try:
+                st = os.stat(path)
+            except OSError:
+                gone.append(key)
+                continue
+            candidates[key] = AudioFile(path, st.st_size, st.st_mtime_ns, st.st_ino)
+
+        known = {m.path: m for m in repo.get_musics_by_paths(conn, [*candidates, *gone])}
+        writes = [
+            make_music(f, read_metadata(f.path), dir_id, root)
+            for key, f in candidates.items()
+            if key not in known or not f.same_as((known[key].size, known[key].mtime_ns, known[key].inode))
+        ]
+        gone = [key for key in gone if key in known]
+
+        removed = 0
+        with transaction(conn, immediate=True):
+            repo.upsert_musics(conn, writes)
+            removed += repo.delete_musics_by_path(conn, gone)
+            for folder in pending.gone_dirs:
+                removed += repo.delete_musics_under(conn, Path(folder).as_posix())
+
+        changed = [m.path for m in writes if m.path in known]
+        return LibraryChange(
+            dir_id,
+            updated=repo.get_musics_by_paths(conn, changed),
+            reload=bool(removed or len(changed) < len(writes)),
+        )
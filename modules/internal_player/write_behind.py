@@ -0,0 +1,106 @@
+"""
+Write-behind queue for small library mutations (play counts, likes).
+
+    writes = WriteBehind()
+    writes.increment_play_count(music.id)   # returns immediately
+    writes.set_like(music.id, True)
+    ...
+    writes.close()                          # final flush on shutdown
+
+Mutations are merged in memory (n plays of one track become a single
++n update, the last like/unlike wins) and committed by a background thread
+every `interval` seconds in one transaction, on its own writer connection,
+so a slow disk never stalls the UI loop. Callers update their in-memory
+Music objects themselves; apply() overlays not-yet-committed changes onto
+rows freshly loaded from the database.
+"""
+import threading
+from collections import Counter
+from typing import Dict, Iterable
+
+import modules.internal_player.repository as repo
+from modules.internal_player.db import DB_PATH, connect, transaction
+from modules.internal_player.models import Music
+
+FLUSH_INTERVAL = 2.0  # seconds
+
+
+class WriteBehind:
+    def __init__(self, path=DB_PATH, interval: float = FLUSH_INTERVAL):
+        self.path = path
+        self.interval = interval
+        self._plays: Counter = Counter()      # music_id -> plays not yet written
+        self._likes: Dict[int, bool] = {}     # music_id -> liked
+        self._inflight_plays: Counter = Counter()
+        self._inflight_likes: Dict[int, bool] = {}
+        self._lock = threading.Lock()
+        self._wake = threading.Event()
+        self._closed = False
+        self._thread = threading.Thread(target=self._run, daemon=True, name="library-writes")
+        self._thread.start()
+
+    # Producers (UI thread)
+    def increment_play_count(self, music_id: int):
+        with self._lock:
+            self._plays[music_id] += 1
+
+    def set_like(self, music_id: int, liked: bool):
+        with self._lock:
+            self._likes[music_id] = liked
+
+    def apply(self, musics: Iterable[Music]):
+        """Overlay mutations that aren't in the database yet onto loaded rows."""
+        with self._lock:
+            plays = self._inflight_plays + self._plays
+            likes = {**self._inflight_likes, **self._likes}
+        if not plays and not likes:
+            return
+        for m in musics:
+            m.played_count += plays.get(m.id, 0)
+            if m.id in likes:
+                m.is_liked = likes[m.id]
+
+    def flush(self):
+        """Ask the worker to write now (doesn't wait)."""
+        self._wake.set()
+
+    def close(self, timeout: float = 5.0):
+        """Write everything still pending and stop the worker."""
+        self._closed = True
+        self._wake.set()
+        self._thread.join(timeout)
+
+    # Worker
+    def _run(self):
+        conn = connect(self.path)
+        try:
+            while not self._closed:
+                self._wake.wait(self.interval)
+                self._wake.clear()
+                self._write(conn)
+            self._write(conn)
+        finally:
+            conn.close()
+
+    def _write(self, conn):
+        with self._lock:
+            if not self._plays and not self._likes:
+                return
+            self._inflight_plays, self._plays = self._plays, Counter()
+            self._inflight_likes, self._likes = self._likes, {}
+            plays, likes = self._inflight_plays, self._inflight_likes
+
+        try:
+            with transaction(conn, immediate=True):
+                repo.increment_play_counts(conn, plays.elements())
+                for liked in (True, False):
+                    repo.set_likes(conn, [i for i, v in likes.items() if v is liked], liked)
+        except Exception as e:
+            # Keep them for the next round (e.g. database locked by a long scan)
+            print(f"Library write failed, will retry: {e}")
+            with self._lock:
+                self._plays = plays + self._plays
+                self._likes = {**likes, **self._likes}
+        finally:
+            with self._lock:
+                self._inflight_plays, self._inflight_likes = Counter(), {}
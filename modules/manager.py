@@ -1,16 +1,15 @@
-from socket import socket
-from modules.camera import Camera
-from modules.gesture import HandTracker
-from modules.music_player import MusicPlayer
-from modules.controller import GestureController
+from modules import startup  # first, so phase offsets start at process launch
 from PyQt6.QtWidgets import QApplication
 from modules.gui import UI
 import sys
 import threading
-from modules.servers import server
-import qrcode
 from PyQt6.QtGui import QImage, QPixmap
 import io
+from time import perf_counter, sleep
+from modules import metrics, tracing
+from modules import memprofile  # GESTURE_MEMPROFILE=N prints allocation reports every N frames
+
+FRAME_SECONDS = metrics.histogram("pipeline_frame_seconds", "End-to-end time of one main loop iteration with a frame")
 
 server_thread = None
 server_running = False
@@ -23,9 +22,12 @@ def start_server():
     window.update_server_status(True)  # وضعیت سرور رو آپدیت کن
 
     def run():
+        # fastapi/uvicorn/websockets are imported here, off the UI thread
+        with startup.phase("server import"):
+            from modules.servers import server
         server.main()
 
-    server_thread = threading.Thread(target=run, daemon=True)
+    server_thread = threading.Thread(target=run, daemon=True, name="server")
     server_thread.start()
 
 
@@ -50,6 +52,8 @@ def stop_server():
 
 # تولید QR code به QPixmap
 def generate_qr_pixmap(url):
+    import qrcode
+
     qr = qrcode.QRCode(
         version=1,
         error_correction=qrcode.constants.ERROR_CORRECT_L,
@@ -66,63 +70,150 @@ def generate_qr_pixmap(url):
     return QPixmap.fromImage(qt_img)
 
 
-def main():
-    global window
-    app = QApplication(sys.argv)
-    window = UI()
+def _open_frame_source(open_source):
+    import settings
 
-    cam = Camera()
-    tracker = HandTracker()
-    player = MusicPlayer()
-    controller = GestureController(player, cooldown=2.5)
+    spec = os.environ.get("GESTURE_SOURCE", settings.CAMERA_SOURCE)
+    return open_source(
+        spec,
+        realtime=os.environ.get("GESTURE_SOURCE_REALTIME", "1") != "0",
+        width=settings.CAMERA_WIDTH,
+        height=settings.CAMERA_HEIGHT,
+        fps=settings.CAMERA_FPS,
+        fourcc=settings.CAMERA_FOURCC,
+        buffer_size=settings.CAMERA_BUFFER_SIZE,
+    )
 
-    window.play_button.clicked.connect(player.play)
-    window.stop_button.clicked.connect(player.stop)
-    window.next_button.clicked.connect(player.next)
+
+class PipelineLoader(threading.Thread):
+    """
+    Imports cv2/mediapipe/pygame, opens the camera, builds the HandTracker and
+    warms up the MediaPipe graph in the background while the window is already up.
+    """
+
+    def __init__(self):
+        super().__init__(daemon=True, name="loader")
+        self.ready = threading.Event()
+        self.error = None
+        self.cam = None
+        self.tracker = None
+        self.player = None
+        self.controller = None
+
+    def run(self):
+        try:
+            startup.timed_import("cv2")
+            startup.timed_import("mediapipe")
+
+            from modules.camera import open_source
+            from modules.gesture import HandTracker
+            from modules.music_player import MusicPlayer
+            from modules.controller import GestureController
+
+            with startup.phase("camera open"):
+                self.cam = _open_frame_source(open_source)
+            with startup.phase("tracker init"):
+                self.tracker = HandTracker()
+            with startup.phase("tracker warm-up"):
+                self.tracker.warm_up()
+            with startup.phase("player init"):
+                self.player = MusicPlayer()
+            self.controller = GestureController(self.player, cooldown=2.5)
+        except Exception as e:
+            self.error = e
+        finally:
+            self.ready.set()
+
+
+def main():
+    global window
+    with startup.phase("window"):
+        app = QApplication(sys.argv)
+        window = UI()
 
     window.run_server_button.clicked.connect(start_server)
     window.stop_server_button.clicked.connect(stop_server)
 
     # QR code fallback
 
-    from modules.qrcode_generator import get_local_ip
-    ip = get_local_ip()
-    qr_url = f"https://{ip}:10001"
+    with startup.phase("qr code"):
+        from modules.qrcode_generator import get_local_ip
+        ip = get_local_ip()
+        from settings import HTTP_PORT
+        qr_url = f"https://{ip}:{HTTP_PORT}"
 
-    qr_pixmap = generate_qr_pixmap(qr_url)
+        qr_pixmap = generate_qr_pixmap(qr_url)
 
+    window.show_pixmap(qr_pixmap)
+    window.update_status("در حال بارگذاری مدل...")
     window.show()
+    app.processEvents()
+
+    loader = PipelineLoader()
+    loader.start()
 
     # اجرای خودکار سرور
     start_server()
 
-    while window.isVisible():
-        frame = cam.get_frame()
-        if frame is None:
-            window.image_label.setPixmap(qr_pixmap)
-            window.update_status("هیچ فریمی انتخاب نشده.\nابتدا QR را اسکن و دسترسی بدهید")
-            app.processEvents()
-            continue
-
-        frame = tracker.process(frame)
-        gesture = tracker.detect_gesture()
-        
-        if gesture is not None:
-            print("Gesture:", gesture)
-
-        if gesture == "Reserve2":
-            exit()
-
-        controller.handle_gesture(gesture)
-
-        if gesture is not None:
-            window.update_status(f"آخرین ژست: {gesture}")
-        else:
-            window.update_status("فریمی دریافت شد، ژست شناسایی نشد")
-
-        window.update_frame(frame)
-        window.update_gesture(gesture)
+    # Keep the window responsive until the heavy parts are loaded
+    while window.isVisible() and not loader.ready.is_set():
         app.processEvents()
+        sleep(0.01)
+
+    if loader.error is not None:
+        window.update_status(f"Failed to start: {loader.error}")
+        raise loader.error
+
+    cam, tracker, player, controller = loader.cam, loader.tracker, loader.player, loader.controller
+    from modules.gesture.overlay import draw_landmarks
+    window.play_button.clicked.connect(player.play)
+    window.stop_button.clicked.connect(player.stop)
+    window.next_button.clicked.connect(player.next)
+    startup.print_report_if_enabled()
+
+    while window.isVisible():
+        with tracing.frame():
+            start = perf_counter()
+            with tracing.span("capture"):
+                frame = cam.get_frame()
+            if frame is None:
+                if cam.finished:
+                    print("Frame source finished")
+                    break
+                window.show_pixmap(qr_pixmap)
+                window.update_status("هیچ فریمی انتخاب نشده.\nابتدا QR را اسکن و دسترسی بدهید")
+                app.processEvents()
+                continue
+
+            with tracing.span("tracker.process"):
+                # File sources stamp frames by stream position, so max-speed runs time gestures the same
+                tracker.process(frame, now=cam.timestamp)
+            with tracing.span("detect_gesture"):
+                gesture = tracker.detect_gesture()
+
+            if gesture is not None:
+                print("Gesture:", gesture)
+
+            if gesture == "Reserve2":
+                exit()
+
+            with tracing.span("dispatch", gesture=gesture):
+                controller.handle_gesture(gesture, now=cam.timestamp)
+
+            with tracing.span("ui"):
+                if gesture is not None:
+                    window.update_status(f"آخرین ژست: {gesture}")
+                else:
+                    window.update_status("فریمی دریافت شد، ژست شناسایی نشد")
+
+                # Landmarks are drawn by the preview only if this frame gets painted
+                landmarks = tracker.landmarks
+                window.update_frame(
+                    frame, overlay=lambda image: draw_landmarks(image, landmarks), pool=cam.pool
+                )
+                window.update_gesture(gesture)
+                app.processEvents()
+            FRAME_SECONDS.observe(perf_counter() - start)
 
     cam.release()
 
@@ -0,0 +1,210 @@
+"""
+Allocation / memory profiling for the frame loop.
+
+Set GESTURE_MEMPROFILE=N (or call memprofile.enable(every=N)) to start
+tracemalloc and print a report every N frames:
+
+    - RSS now and peak RSS of the process
+    - bytes allocated per stage: net (kept after the stage) and peak (temporary
+      arrays included), averaged per call; stages are the tracing spans
+      (capture, convert, mediapipe, detect_*, ingest.decode, ...)
+    - top source lines whose live memory grew since the previous report
+      (leak suspects) and the largest live allocation sites
+
+Profiling turns tracing on as well, since stages come from tracing spans.
+tracemalloc is process-wide, so allocations made by other threads while a
+stage runs (e.g. server decodes during tracker.process) are counted in it.
+"""
+import os
+import sys
+import threading
+import tracemalloc
+from collections import defaultdict
+
+from modules import metrics, tracing
+
+DEFAULT_EVERY = 300  # frames between reports
+TOP_SITES = 10
+
+RSS_BYTES = metrics.gauge("process_resident_memory_bytes", "Resident set size at the last memory report")
+TRACED_BYTES = metrics.gauge("tracemalloc_traced_bytes", "Memory traced by tracemalloc at the last report")
+
+# Profiler overhead (tracemalloc itself, the tracing ring buffer) is left out of the reports
+_IGNORE = (
+    tracemalloc.Filter(False, tracemalloc.__file__),
+    tracemalloc.Filter(False, tracing.__file__),
+    tracemalloc.Filter(False, __file__),
+    tracemalloc.Filter(False, "<frozen importlib._bootstrap>"),
+    tracemalloc.Filter(False, "<frozen importlib._bootstrap_external>"),
+    tracemalloc.Filter(False, "<unknown>"),
+)
+# "Largest live sites" only lists this project's own files
+_PROJECT = tracemalloc.Filter(True, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "*"))
+
+
+def current_rss() -> int:
+    """Resident set size in bytes (Linux /proc, else 0)."""
+    try:
+        with open("/proc/self/statm") as f:
+            return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+    except (OSError, ValueError, IndexError):
+        return 0
+
+
+def peak_rss() -> int:
+    try:
+        import resource
+    except ImportError:  # Windows
+        return 0
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return peak if sys.platform == "darwin" else peak * 1024  # bytes on macOS, KiB on Linux
+
+
+def _fmt(n: float) -> str:
+    for unit in ("B", "KiB", "MiB"):
+        if abs(n) < 1024:
+            return f"{n:.0f} {unit}" if unit == "B" else f"{n:.1f} {unit}"
+        n /= 1024
+    return f"{n:.1f} GiB"
+
+
+class _StageStats:
+    __slots__ = ("calls", "net", "peak", "max_peak")
+
+    def __init__(self):
+        self.calls = 0
+        self.net = 0       # sum of bytes still allocated when the stage ended
+        self.peak = 0      # sum of per-call peaks above the starting point
+        self.max_peak = 0
+
+
+class MemoryProfiler:
+    """tracing observer: measures tracemalloc deltas per span and reports every N frames."""
+
+    def __init__(self, every: int = DEFAULT_EVERY, top: int = TOP_SITES, out=None):
+        self.every = every
+        self.top = top
+        self.out = out or sys.stdout
+        self.frames = defaultdict(int)
+        self.stages = defaultdict(_StageStats)
+        self._local = threading.local()
+        self._lock = threading.Lock()
+        self._frames_since_report = 0
+        self._previous = None
+
+    # Span hooks. Peaks are tracked with reset_peak(), so a nested span folds
+    # the peak it saw into its parent before resetting.
+    def _stack(self):
+        stack = getattr(self._local, "stack", None)
+        if stack is None:
+            stack = self._local.stack = []
+        return stack
+
+    def span_enter(self, name):
+        stack = self._stack()
+        current, peak = tracemalloc.get_traced_memory()
+        if stack:
+            stack[-1][1] = max(stack[-1][1], peak)
+        tracemalloc.reset_peak()
+        stack.append([current, current])
+
+    def span_exit(self, name):
+        stack = self._stack()
+        if not stack:
+            return
+        start, child_peak = stack.pop()
+        current, peak = tracemalloc.get_traced_memory()
+        peak = max(peak, child_peak)
+        if stack:
+            stack[-1][1] = max(stack[-1][1], peak)
+        with self._lock:
+            stats = self.stages[name]
+            stats.calls += 1
+            stats.net += current - start
+            stats.peak += peak - start
+            stats.max_peak = max(stats.max_peak, peak - start)
+
+    def frame_end(self, name):
+        if self._previous is None:
+            # Baseline after the first frame, so start-up imports don't show up as growth
+            self._previous = self._snapshot()
+        with self._lock:
+            self.frames[name] += 1
+            self._frames_since_report += 1
+            due = self._frames_since_report >= self.every
+            if due:
+                self._frames_since_report = 0
+        if due:
+            print(self.report(), file=self.out, flush=True)
+
+    # Reporting
+    def _snapshot(self):
+        return tracemalloc.take_snapshot().filter_traces(_IGNORE)
+
+    def report(self) -> str:
+        snapshot = self._snapshot()
+        previous, self._previous = self._previous, snapshot
+        rss, traced = current_rss(), tracemalloc.get_traced_memory()[0]
+        RSS_BYTES.set(rss)
+        TRACED_BYTES.set(traced)
+
+        with self._lock:
+            frames = dict(self.frames)
+            stages = {name: (s.calls, s.net, s.peak, s.max_peak) for name, s in self.stages.items()}
+            self.stages.clear()
+
+        lines = [
+            f"=== memory: frames {frames}  rss {_fmt(rss)}  peak rss {_fmt(peak_rss())}  traced {_fmt(traced)}",
+            f"{'stage':<24} {'calls':>7} {'net/call':>10} {'peak/call':>10} {'max peak':>10}",
+        ]
+        for name, (calls, net, peak, max_peak) in sorted(stages.items(), key=lambda kv: -kv[1][2]):
+            lines.append(
+                f"{name:<24} {calls:>7} {_fmt(net / calls):>10} {_fmt(peak / calls):>10} {_fmt(max_peak):>10}"
+            )
+
+        if previous is not None:
+            growth = [s for s in snapshot.compare_to(previous, "lineno") if s.size_diff > 0]
+            lines.append("top growth since last report:")
+            for stat in growth[: self.top]:
+                frame = stat.traceback[0]
+                lines.append(
+                    f"  {_fmt(stat.size_diff):>10} {stat.count_diff:>+7} blocks  {frame.filename}:{frame.lineno}"
+                )
+
+        lines.append("largest live allocation sites in the project:")
+        for stat in snapshot.filter_traces((_PROJECT,)).statistics("lineno")[: self.top]:
+            frame = stat.traceback[0]
+            lines.append(f"  {_fmt(stat.size):>10} {stat.count:>7} blocks  {frame.filename}:{frame.lineno}")
+        return "\n".join(lines)
+
+
+profiler = None
+
+
+def enable(every: int = DEFAULT_EVERY, top: int = TOP_SITES):
+    global profiler
+    if profiler is not None:
+        return profiler
+    if not tracemalloc.is_tracing():
+        tracemalloc.start()
+    profiler = MemoryProfiler(every=every, top=top)
+    tracing.observer = profiler
+    if not tracing.enabled:
+        tracing.enable(slow_frame_ms=None)
+    return profiler
+
+
+def disable():
+    global profiler
+    tracing.observer = None
+    profiler = None
+    tracemalloc.stop()
+
+
+def _enable_from_env():
+    every = os.environ.get("GESTURE_MEMPROFILE")
+    if every:
+        enable(every=int(every) if every.isdigit() and int(every) > 1 else DEFAULT_EVERY)
+
+
+_enable_from_env()
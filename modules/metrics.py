@@ -0,0 +1,251 @@
+"""
+Minimal Prometheus-style metrics registry (no external dependency).
+
+Counters, gauges and fixed-bucket histograms, optionally with labels.
+Each labelled child holds its own small lock, so updates on the hot path
+are a dict lookup plus an uncontended lock acquire.
+
+    FRAMES = counter("camera_frames_total", "Frames read from the camera")
+    FRAMES.inc()
+
+    with PROCESS_SECONDS.time():
+        ...
+
+render() returns the text exposition format served at /metrics.
+"""
+import threading
+from bisect import bisect_left
+from time import perf_counter
+
+# Latency buckets in seconds, tuned for per-frame work (0.1 ms .. 1 s)
+LATENCY_BUCKETS = (
+    0.0001, 0.00025, 0.0005, 0.001, 0.0025, 0.005,
+    0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0,
+)
+
+
+def _escape(value: str) -> str:
+    return str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+class _Timer:
+    __slots__ = ("_observe", "_start")
+
+    def __init__(self, observe):
+        self._observe = observe
+
+    def __enter__(self):
+        self._start = perf_counter()
+        return self
+
+    def __exit__(self, *exc):
+        self._observe(perf_counter() - self._start)
+        return False
+
+
+# -------------------------
+# Metric values (one per label combination)
+# -------------------------
+class _CounterValue:
+    __slots__ = ("_lock", "value")
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.value = 0.0
+
+    def inc(self, amount: float = 1.0):
+        with self._lock:
+            self.value += amount
+
+
+class _GaugeValue:
+    __slots__ = ("_lock", "value")
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.value = 0.0
+
+    def set(self, value: float):
+        self.value = value
+
+    def inc(self, amount: float = 1.0):
+        with self._lock:
+            self.value += amount
+
+    def dec(self, amount: float = 1.0):
+        self.inc(-amount)
+
+
+class _HistogramValue:
+    __slots__ = ("_lock", "_bounds", "counts", "sum", "count")
+
+    def __init__(self, bounds):
+        self._lock = threading.Lock()
+        self._bounds = bounds
+        self.counts = [0] * (len(bounds) + 1)  # last slot is +Inf
+        self.sum = 0.0
+        self.count = 0
+
+    def observe(self, value: float):
+        i = bisect_left(self._bounds, value)
+        with self._lock:
+            self.counts[i] += 1
+            self.sum += value
+            self.count += 1
+
+    def time(self):
+        return _Timer(self.observe)
+
+
+# -------------------------
+# Metric families
+# -------------------------
+class _Metric:
+    kind = ""
+
+    def __init__(self, name: str, documentation: str, labelnames=()):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self._children = {}
+        self._lock = threading.Lock()
+        if not self.labelnames:
+            self._default = self._new_value()
+            self._children[()] = self._default
+
+    def _new_value(self):
+        raise NotImplementedError
+
+    def labels(self, **labels):
+        key = tuple(str(labels[name]) for name in self.labelnames)
+        child = self._children.get(key)
+        if child is None:
+            with self._lock:
+                child = self._children.setdefault(key, self._new_value())
+        return child
+
+    def remove(self, **labels):
+        """Drop one label combination (e.g. a disconnected client)."""
+        key = tuple(str(labels[name]) for name in self.labelnames)
+        with self._lock:
+            self._children.pop(key, None)
+
+    def _samples(self):
+        with self._lock:
+            return list(self._children.items())
+
+    @staticmethod
+    def _format_labels(names, values, extra=()):
+        pairs = list(zip(names, values)) + list(extra)
+        if not pairs:
+            return ""
+        body = ",".join(f'{k}="{_escape(v)}"' for k, v in pairs)
+        return "{" + body + "}"
+
+
+class Counter(_Metric):
+    kind = "counter"
+
+    def _new_value(self):
+        return _CounterValue()
+
+    def inc(self, amount: float = 1.0):
+        self._default.inc(amount)
+
+    def render(self):
+        for key, child in self._samples():
+            yield f"{self.name}{self._format_labels(self.labelnames, key)} {child.value}"
+
+
+class Gauge(_Metric):
+    kind = "gauge"
+
+    def _new_value(self):
+        return _GaugeValue()
+
+    def set(self, value: float):
+        self._default.set(value)
+
+    def inc(self, amount: float = 1.0):
+        self._default.inc(amount)
+
+    def dec(self, amount: float = 1.0):
+        self._default.dec(amount)
+
+    def render(self):
+        for key, child in self._samples():
+            yield f"{self.name}{self._format_labels(self.labelnames, key)} {child.value}"
+
+
+class Histogram(_Metric):
+    kind = "histogram"
+
+    def __init__(self, name, documentation, labelnames=(), buckets=LATENCY_BUCKETS):
+        self.buckets = tuple(sorted(buckets))
+        super().__init__(name, documentation, labelnames)
+
+    def _new_value(self):
+        return _HistogramValue(self.buckets)
+
+    def observe(self, value: float):
+        self._default.observe(value)
+
+    def time(self):
+        return self._default.time()
+
+    def render(self):
+        bounds = [str(b) for b in self.buckets] + ["+Inf"]
+        for key, child in self._samples():
+            with child._lock:
+                counts, total, count = list(child.counts), child.sum, child.count
+            cumulative = 0
+            for le, n in zip(bounds, counts):
+                cumulative += n
+                labels = self._format_labels(self.labelnames, key, [("le", le)])
+                yield f"{self.name}_bucket{labels} {cumulative}"
+            labels = self._format_labels(self.labelnames, key)
+            yield f"{self.name}_sum{labels} {total}"
+            yield f"{self.name}_count{labels} {count}"
+
+
+# -------------------------
+# Registry
+# -------------------------
+_registry = {}
+_registry_lock = threading.Lock()
+
+
+def _register(cls, name, documentation, labelnames=(), **kwargs):
+    with _registry_lock:
+        metric = _registry.get(name)
+        if metric is None:
+            metric = cls(name, documentation, labelnames, **kwargs)
+            _registry[name] = metric
+        elif not isinstance(metric, cls):
+            raise ValueError(f"Metric {name!r} already registered as {metric.kind}")
+        return metric
+
+
+def counter(name: str, documentation: str, labelnames=()) -> Counter:
+    return _register(Counter, name, documentation, labelnames)
+
+
+def gauge(name: str, documentation: str, labelnames=()) -> Gauge:
+    return _register(Gauge, name, documentation, labelnames)
+
+
+def histogram(name: str, documentation: str, labelnames=(), buckets=LATENCY_BUCKETS) -> Histogram:
+    return _register(Histogram, name, documentation, labelnames, buckets=buckets)
+
+
+def render() -> str:
+    """Return all metrics in the Prometheus text exposition format."""
+    with _registry_lock:
+        metrics = list(_registry.values())
+
+    lines = []
+    for metric in metrics:
+        lines.append(f"# HELP {metric.name} {metric.documentation}")
+        lines.append(f"# TYPE {metric.name} {metric.kind}")
+        lines.extend(metric.render())
+    return "\n".join(lines) + "\n"
@@ -1,6 +1,3 @@
-import qrcode
-from PIL import Image, ImageTk
-import tkinter as tk
 import socket
 
 def get_local_ip():
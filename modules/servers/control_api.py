@@ -0,0 +1,85 @@
+import asyncio
+import json
+from fastapi import APIRouter, HTTPException, WebSocket, WebSocketDisconnect
+from modules.servers import shared_frame
+from modules.servers.ingest import latest_frames, connected_clients
+
+# Client selection without the OpenCV mosaic (used by headless mode,
+# but also works alongside mouse selection in the GUI mode)
+router = APIRouter()
+
+STATE_PUSH_INTERVAL = 1.0  # seconds
+
+
+def get_state():
+    return {
+        "clients": sorted(connected_clients.values()),
+        "streaming": sorted(latest_frames.keys()),
+        "selected": shared_frame.get_main_client_id(),
+    }
+
+
+def apply_selection(client_id):
+    """Select `client_id` (or clear the selection for None). Returns False if unknown."""
+    if client_id is None:
+        shared_frame.clear_selection()
+        return True
+    if client_id not in connected_clients.values():
+        return False
+    shared_frame.select_client(client_id)
+    return True
+
+
+@router.get("/api/clients")
+async def list_clients():
+    return get_state()
+
+
+@router.post("/api/clients/{client_id}/select")
+async def select_client(client_id: str):
+    if not apply_selection(client_id):
+        raise HTTPException(status_code=404, detail=f"Unknown client {client_id}")
+    return get_state()
+
+
+@router.delete("/api/selection")
+async def clear_selection():
+    apply_selection(None)
+    return get_state()
+
+
+@router.websocket("/ws/control")
+async def control_ws(websocket: WebSocket):
+    """
+    JSON control channel.
+    - Send {"select": "<client_id>"} or {"select": null}.
+    - The current state is pushed on connect, after each command and whenever it changes.
+    """
+    await websocket.accept()
+    last_state = get_state()
+    await websocket.send_json(last_state)
+
+    try:
+        while True:
+            try:
+                text = await asyncio.wait_for(websocket.receive_text(), timeout=STATE_PUSH_INTERVAL)
+            except asyncio.TimeoutError:
+                state = get_state()
+                if state != last_state:
+                    last_state = state
+                    await websocket.send_json(state)
+                continue
+
+            try:
+                command = json.loads(text)
+            except json.JSONDecodeError:
+                await websocket.send_json({"error": "invalid JSON"})
+                continue
+
+            if "select" in command and not apply_selection(command["select"]):
+                await websocket.send_json({"error": f"Unknown client {command['select']}"})
+
+            last_state = get_state()
+            await websocket.send_json(last_state)
+    except WebSocketDisconnect:
+        pass
@@ -2,61 +2,73 @@ import cv2
 import numpy as np
 import asyncio
 import math
+from time import perf_counter
+from modules import metrics, tracing
+from modules.servers import shared_frame
+from modules.frame_pool import FramePool
 
 # تنظیمات
 MAX_CLIENTS = 4
 FRAME_WIDTH = 320
 FRAME_HEIGHT = 240
 
+RENDER_SECONDS = metrics.histogram("mosaic_render_seconds", "Time to build and show the client mosaic")
+MOSAIC_FRAMES = metrics.counter("mosaic_frames_total", "Mosaic frames rendered")
+PENDING_FRAMES = metrics.gauge("mosaic_pending_frames", "Client frames waiting in latest_frames")
+
+# Mosaic canvases are reused between iterations (tiles are resized straight into them)
+_pool = FramePool("mosaic")
+
 # متغیر سراسری برای نگه داشتن main_frame
-main_frame_id = None
 main_frame = None
 the_frame = None
 
 # توابع دسترسی از ماژول دیگر
+# (the selected id lives in shared_frame so headless mode can select without this module)
 def get_main_frame_id():
-    return main_frame_id
+    return shared_frame.get_main_client_id()
 
 def get_main_frame():
     return main_frame
 
 # callback ماوس برای انتخاب یا لغو انتخاب فریم
 def mouse_callback(event, x, y, flags, param):
-    global main_frame_id, main_frame
+    global main_frame
     if event == cv2.EVENT_LBUTTONDOWN:
         client_positions = param["positions"]
         latest_frames = param["latest_frames"]
         for client_id, (x1, y1, x2, y2) in client_positions.items():
             if x1 <= x < x2 and y1 <= y < y2:
-                if client_id == main_frame_id:
+                if client_id == shared_frame.get_main_client_id():
                     # اگر دوباره روی همان فریم کلیک شد، لغو انتخاب
-                    main_frame_id = None
+                    shared_frame.clear_selection()
                     main_frame = None
-                    print(f"Main frame selection cancelled")
                 else:
                     # انتخاب فریم جدید
-                    main_frame_id = client_id
+                    shared_frame.select_client(client_id)
                     main_frame = latest_frames[client_id].copy()
-                    print(f"Selected main frame: {main_frame_id}")
                 break
 
 async def show_frames(latest_frames):
-    global main_frame_id, main_frame, the_frame
+    global main_frame, the_frame
     while True:
+        start = perf_counter()
         client_ids = list(latest_frames.keys())
         n_clients = len(client_ids)
+        PENDING_FRAMES.set(n_clients)
         if n_clients == 0:
-            canvas = np.zeros((FRAME_HEIGHT, FRAME_WIDTH, 3), dtype=np.uint8)
+            canvas = _pool.acquire((FRAME_HEIGHT, FRAME_WIDTH, 3))
+            canvas.fill(0)
             client_positions = {}
         else:
             rows = math.ceil(math.sqrt(n_clients))
             cols = math.ceil(n_clients / rows)
-            canvas = np.zeros((rows * FRAME_HEIGHT, cols * FRAME_WIDTH, 3), dtype=np.uint8)
+            canvas = _pool.acquire((rows * FRAME_HEIGHT, cols * FRAME_WIDTH, 3))
+            canvas.fill(0)
             client_positions = {}
 
             for idx, client_id in enumerate(client_ids):
                 frame = latest_frames[client_id]
-                frame_resized = cv2.resize(frame, (FRAME_WIDTH, FRAME_HEIGHT))
                 
                 row_idx = idx // cols
                 col_idx = idx % cols
@@ -66,25 +78,31 @@ async def show_frames(latest_frames):
                 x1 = col_idx * FRAME_WIDTH
                 x2 = x1 + FRAME_WIDTH
                 
-                canvas[y1:y2, x1:x2] = frame_resized
+                with tracing.span("mosaic.resize"):
+                    cv2.resize(frame, (FRAME_WIDTH, FRAME_HEIGHT), dst=canvas[y1:y2, x1:x2])
                 cv2.putText(canvas, f"ID: {client_id}", (x1 + 5, y1 + 20),
                             cv2.FONT_HERSHEY_SIMPLEX, 0.5, (0, 255, 0), 1)
                 
-                if client_id == main_frame_id:
+                if client_id == shared_frame.get_main_client_id():
                     cv2.rectangle(canvas, (x1, y1), (x2, y2), (0, 255, 0), 2)
                     # آپدیت پنجره main_frame
-                    main_frame = frame.copy()
+                    with tracing.span("mosaic.copy"):
+                        main_frame = frame.copy()
 
                 client_positions[client_id] = (x1, y1, x2, y2)
 
         cv2.imshow("All Clients", canvas)
+        _pool.release(canvas)  # imshow keeps its own copy
         # نمایش main_frame در پنجره جداگانه
         if main_frame is not None:
             the_frame = main_frame
 
         cv2.setMouseCallback("All Clients", mouse_callback, param={"positions": client_positions, "latest_frames": latest_frames})
         
-        if cv2.waitKey(1) & 0xFF == ord("q"):
+        key = cv2.waitKey(1)
+        RENDER_SECONDS.observe(perf_counter() - start)
+        MOSAIC_FRAMES.inc()
+        if key & 0xFF == ord("q"):
             break
         await asyncio.sleep(0.01)
 
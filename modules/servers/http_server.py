@@ -1,28 +1,85 @@
-from fastapi import FastAPI
-from fastapi.responses import FileResponse
-from fastapi.staticfiles import StaticFiles
+import asyncio
+from fastapi import FastAPI, WebSocket
+from fastapi.responses import JSONResponse, PlainTextResponse
 import uvicorn
-from settings import CERT_FILE, KEY_FILE
+from settings import CERT_FILE, KEY_FILE, HTTP_PORT
+from modules import metrics, tracing
+from modules.servers.static_assets import StaticAssets
+from modules.servers.control_api import router as control_router
+from modules.servers.ingest import (
+    TIMEOUT,
+    register_client,
+    unregister_client,
+    handle_message,
+)
 
 app = FastAPI()
+app.include_router(control_router)
 
-# Mount web directory for static files
-app.mount("/", StaticFiles(directory="web", html=True), name="web")
+# Web directory is loaded into memory once (precompressed, ETag-validated)
+static_assets = StaticAssets(directory="web", index="index.html")
 
-# If you want, specifically give index.html.
-@app.get("/")
-async def index():
-    return FileResponse("web/index.html")
 
+@app.get("/metrics")
+async def metrics_endpoint():
+    return PlainTextResponse(metrics.render(), media_type="text/plain; version=0.0.4")
 
-async def start_http_server():
+
+@app.get("/debug/trace")
+async def trace_endpoint():
+    # Ring buffer as Chrome trace JSON (empty unless GESTURE_TRACE is set)
+    return JSONResponse(tracing.chrome_trace())
+
+
+# Frame ingest on the same TLS listener as the web UI
+@app.websocket("/ws")
+async def frames_ws(websocket: WebSocket):
+    await websocket.accept()
+    client_id = register_client(websocket)
+    if client_id is None:
+        await websocket.close()
+        return
+
+    try:
+        while True:
+            try:
+                message = await asyncio.wait_for(websocket.receive(), timeout=TIMEOUT)
+            except asyncio.TimeoutError:
+                print(f"Client {client_id} timed out. Closing connection.")
+                await websocket.close()
+                break
+
+            if message["type"] == "websocket.disconnect":
+                print(f"Client {client_id} disconnected")
+                break
+
+            if message.get("bytes") is not None:
+                handle_message(client_id, message["bytes"])
+            else:
+                handle_message(client_id, message.get("text"))
+    finally:
+        unregister_client(websocket, client_id)
+
+
+# Static files are mounted last so API routes above take priority
+app.mount("/", static_assets, name="web")
+
+
+async def start_http_server(watch_static: bool = False):
     config = uvicorn.Config(
         app,
         host="0.0.0.0",
-        port=10001,
+        port=HTTP_PORT,
         ssl_certfile=CERT_FILE,
         ssl_keyfile=KEY_FILE,
         reload=False,
     )
     server = uvicorn.Server(config)
-    await server.serve()
+
+    # Optional: reload web/ assets when files change on disk
+    watch_task = asyncio.create_task(static_assets.watch()) if watch_static else None
+    try:
+        await server.serve()
+    finally:
+        if watch_task is not None:
+            watch_task.cancel()
@@ -0,0 +1,65 @@
+import uuid
+import cv2
+import numpy as np
+from time import perf_counter
+from modules import metrics, tracing
+from modules.servers import shared_frame
+
+MAX_CLIENTS = 3
+TIMEOUT = 30  # seconds
+
+connected_clients = {}  # websocket -> client_id
+latest_frames = {}      # client_id -> frame (numpy array)
+
+CLIENTS_CONNECTED = metrics.gauge("ingest_clients_connected", "Connected frame clients")
+CLIENTS_REJECTED = metrics.counter("ingest_clients_rejected_total", "Clients rejected (server full)")
+MESSAGES = metrics.counter("ingest_messages_total", "Messages received", ["client"])
+BYTES = metrics.counter("ingest_bytes_total", "Payload bytes received", ["client"])
+DECODE_FAILURES = metrics.counter("ingest_decode_failures_total", "Messages that failed to decode", ["client"])
+DECODE_SECONDS = metrics.histogram("ingest_decode_seconds", "JPEG decode time per message")
+_PER_CLIENT = (MESSAGES, BYTES, DECODE_FAILURES)
+
+
+# Transport-independent client bookkeeping, shared by the /ws route in
+# http_server and the standalone `websockets` server in wss_server.
+def register_client(websocket):
+    """Return a new client id, or None if the server is full."""
+    if len(connected_clients) >= MAX_CLIENTS:
+        print("Max clients reached, rejecting new client.")
+        CLIENTS_REJECTED.inc()
+        return None
+
+    client_id = str(uuid.uuid4())[:8]
+    connected_clients[websocket] = client_id
+    CLIENTS_CONNECTED.set(len(connected_clients))
+    print(f"New client connected! ID={client_id}, Total clients: {len(connected_clients)}")
+    return client_id
+
+
+def unregister_client(websocket, client_id):
+    connected_clients.pop(websocket, None)
+    latest_frames.pop(client_id, None)
+    if shared_frame.get_main_client_id() == client_id:
+        shared_frame.clear_selection()
+    CLIENTS_CONNECTED.set(len(connected_clients))
+    for metric in _PER_CLIENT:
+        metric.remove(client=client_id)
+    print(f"Client {client_id} removed. Total clients: {len(connected_clients)}")
+
+
+def handle_message(client_id, message):
+    """Decode one JPEG message and store it as the client's latest frame."""
+    MESSAGES.labels(client=client_id).inc()
+    if isinstance(message, (bytes, bytearray)):
+        BYTES.labels(client=client_id).inc(len(message))
+        start = perf_counter()
+        with tracing.span("ingest.decode"):
+            nparr = np.frombuffer(message, np.uint8)
+            frame = cv2.imdecode(nparr, cv2.IMREAD_COLOR)
+        DECODE_SECONDS.observe(perf_counter() - start)
+        if frame is not None:
+            latest_frames[client_id] = frame
+        else:
+            DECODE_FAILURES.labels(client=client_id).inc()
+    else:
+        print(f"Client {client_id} sent non-binary message:", message)
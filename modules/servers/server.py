@@ -1,15 +1,21 @@
 import asyncio
-from modules.servers.wss_server import start_server, latest_frames
+from settings import STANDALONE_WSS
+from modules.servers.ingest import latest_frames
 from modules.servers.frame_parser import show_frames, the_frame
 from modules.servers.http_server import start_http_server
 
 
 async def task_manager():
-    task1 = asyncio.create_task(start_server())
-    task2 = asyncio.create_task(show_frames(latest_frames))
-    task3 = asyncio.create_task(start_http_server())
-
-    tasks = [task1, task2, task3]
+    # Web UI and frame WebSocket (/ws) share one uvicorn server and TLS listener
+    tasks = [
+        asyncio.create_task(show_frames(latest_frames)),
+        asyncio.create_task(start_http_server()),
+    ]
+
+    # Optional legacy listener on WSS_PORT for clients that still connect there
+    if STANDALONE_WSS:
+        from modules.servers.wss_server import start_server
+        tasks.append(asyncio.create_task(start_server()))
 
     try:
         await asyncio.gather(*tasks)
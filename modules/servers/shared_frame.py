@@ -1,3 +1,23 @@
 # shared_frame.py
+# Which client's stream drives gesture control. Kept free of GUI imports so the
+# mosaic (frame_parser), the HTTP control API and headless mode can all share it.
 main_frame = None
-main_client_id = None
\ No newline at end of file
+main_client_id = None
+
+
+def get_main_client_id():
+    return main_client_id
+
+
+def select_client(client_id):
+    global main_client_id, main_frame
+    main_client_id = client_id
+    main_frame = None
+    print(f"Selected main frame: {client_id}")
+
+
+def clear_selection():
+    global main_client_id, main_frame
+    main_client_id = None
+    main_frame = None
+    print("Main frame selection cancelled")
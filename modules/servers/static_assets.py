@@ -0,0 +1,192 @@
+import asyncio
+import gzip
+import hashlib
+import mimetypes
+import re
+from pathlib import Path
+
+from starlette.responses import Response
+
+try:
+    import brotli
+except ImportError:  # brotli is optional, gzip is always available
+    brotli = None
+
+# Assets referenced from HTML get a ?v=<hash> suffix so they can be cached forever
+IMMUTABLE_CACHE = "public, max-age=31536000, immutable"
+# HTML must be revalidated on every load (cheap 304 when nothing changed)
+REVALIDATE_CACHE = "no-cache"
+
+MIN_COMPRESS_SIZE = 256  # bytes, smaller bodies are not worth compressing
+WATCH_INTERVAL = 1.0  # seconds
+
+COMPRESSIBLE_TYPES = ("text/", "application/javascript", "application/json", "image/svg+xml")
+
+
+class Asset:
+    """One file held in memory with its precompressed variants."""
+
+    def __init__(self, body: bytes, media_type: str, cache_control: str):
+        self.media_type = media_type
+        self.cache_control = cache_control
+        digest = hashlib.sha256(body).hexdigest()
+        self.version = digest[:12]
+        self.variants = {"identity": body}
+
+        if len(body) >= MIN_COMPRESS_SIZE and media_type.startswith(COMPRESSIBLE_TYPES):
+            gz = gzip.compress(body, compresslevel=9, mtime=0)
+            if len(gz) < len(body):
+                self.variants["gzip"] = gz
+            if brotli is not None:
+                br = brotli.compress(body, quality=11)
+                if len(br) < len(body):
+                    self.variants["br"] = br
+
+        # Strong validators must differ per representation, so tag each encoding
+        self.etags = {
+            encoding: f'"{digest[:32]}"' if encoding == "identity" else f'"{digest[:32]}-{encoding}"'
+            for encoding in self.variants
+        }
+
+    def pick_encoding(self, accept_encoding: str) -> str:
+        accepted = set()
+        for part in accept_encoding.split(","):
+            name, _, params = part.strip().partition(";")
+            if params.replace(" ", "") in ("q=0", "q=0.0"):
+                continue
+            accepted.add(name.strip().lower())
+        for encoding in ("br", "gzip"):
+            if encoding in accepted and encoding in self.variants:
+                return encoding
+        return "identity"
+
+
+class StaticAssets:
+    """
+    ASGI app serving a directory from memory.
+    - Files are read once at startup (and again on change when watching).
+    - gzip/brotli variants are precompressed and chosen by Accept-Encoding.
+    - Strong ETags answer If-None-Match with 304 Not Modified.
+    """
+
+    def __init__(self, directory: str = "web", index: str = "index.html"):
+        self.directory = Path(directory)
+        self.index = index
+        self.assets = {}  # url path ("/", "/main.js", ...) -> Asset
+        self._mtimes = {}
+        self.load()
+
+    # -------------------------
+    # Loading
+    # -------------------------
+    def _scan_mtimes(self):
+        return {
+            p: p.stat().st_mtime_ns
+            for p in self.directory.rglob("*")
+            if p.is_file()
+        }
+
+    def load(self):
+        mtimes = self._scan_mtimes()
+        raw = {p.relative_to(self.directory).as_posix(): p.read_bytes() for p in mtimes}
+
+        assets = {}
+        for name, body in raw.items():
+            if name.endswith(".html"):
+                continue
+            assets["/" + name] = Asset(body, self._media_type(name), IMMUTABLE_CACHE)
+
+        # Rewrite references in HTML so each asset URL changes with its content
+        for name, body in raw.items():
+            if not name.endswith(".html"):
+                continue
+            html = self._version_references(body.decode("utf-8"), assets)
+            asset = Asset(html.encode("utf-8"), "text/html; charset=utf-8", REVALIDATE_CACHE)
+            assets["/" + name] = asset
+            if name == self.index:
+                assets["/"] = asset
+
+        self.assets = assets
+        self._mtimes = mtimes
+
+    @staticmethod
+    def _media_type(name: str) -> str:
+        media_type = mimetypes.guess_type(name)[0] or "application/octet-stream"
+        if media_type.startswith("text/") or media_type == "application/javascript":
+            media_type += "; charset=utf-8"
+        return media_type
+
+    @staticmethod
+    def _version_references(html: str, assets: dict) -> str:
+        def replace(match):
+            attr, url = match.group(1), match.group(2)
+            asset = assets.get("/" + url.lstrip("./"))
+            if asset is None:
+                return match.group(0)
+            return f'{attr}="{url}?v={asset.version}"'
+
+        return re.sub(r'(src|href)="(?!https?:|//|data:)([^"?#]+)"', replace, html)
+
+    async def watch(self, interval: float = WATCH_INTERVAL):
+        """Poll the directory and reload all assets when something changes."""
+        while True:
+            await asyncio.sleep(interval)
+            try:
+                if self._scan_mtimes() != self._mtimes:
+                    self.load()
+                    print(f"Static assets reloaded from {self.directory}/")
+            except OSError as e:
+                print("Static asset reload failed:", e)
+
+    # -------------------------
+    # ASGI
+    # -------------------------
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            return
+
+        response = self.respond(scope)
+        await response(scope, receive, send)
+
+    def respond(self, scope) -> Response:
+        if scope["method"] not in ("GET", "HEAD"):
+            return Response(status_code=405, headers={"Allow": "GET, HEAD"})
+
+        path = scope.get("path", "/")
+        # When mounted, strip the mount prefix
+        root_path = scope.get("root_path", "")
+        if root_path and path.startswith(root_path):
+            path = path[len(root_path):] or "/"
+        if path.endswith("/") and path != "/":
+            path += self.index
+
+        asset = self.assets.get(path)
+        if asset is None:
+            return Response("Not Found", status_code=404, media_type="text/plain")
+
+        headers = {}
+        for key, value in scope["headers"]:
+            headers[key.decode("latin-1").lower()] = value.decode("latin-1")
+
+        encoding = asset.pick_encoding(headers.get("accept-encoding", ""))
+        response_headers = {
+            "ETag": asset.etags[encoding],
+            "Cache-Control": asset.cache_control,
+            "Vary": "Accept-Encoding",
+        }
+
+        if_none_match = headers.get("if-none-match")
+        if if_none_match and (
+            if_none_match.strip() == "*"
+            or asset.etags[encoding] in [tag.strip() for tag in if_none_match.split(",")]
+        ):
+            return Response(status_code=304, headers=response_headers)
+
+        body = asset.variants[encoding]
+        if encoding != "identity":
+            response_headers["Content-Encoding"] = encoding
+
+        if scope["method"] == "HEAD":
+            response_headers["Content-Length"] = str(len(body))
+            return Response(status_code=200, headers=response_headers, media_type=asset.media_type)
+        return Response(body, headers=response_headers, media_type=asset.media_type)
@@ -1,33 +1,30 @@
 import asyncio
 import websockets
-import cv2
-import numpy as np
 import ssl
-import uuid
-from settings import CERT_FILE, KEY_FILE
+from settings import CERT_FILE, KEY_FILE, WSS_PORT
+from modules.servers.ingest import (
+    TIMEOUT,
+    latest_frames,
+    register_client,
+    unregister_client,
+    handle_message,
+)
 
-MAX_CLIENTS = 3
-TIMEOUT = 30  # seconds
 
-ssl_context = ssl.SSLContext(ssl.PROTOCOL_TLS_SERVER)
-ssl_context.load_cert_chain(certfile=CERT_FILE, keyfile=KEY_FILE)
 
-connected_clients = {}  # websocket -> client_id
-latest_frames = {}      # client_id -> frame (numpy array)
+def create_ssl_context():
+    # Built when the server starts, not at import time
+    ssl_context = ssl.SSLContext(ssl.PROTOCOL_TLS_SERVER)
+    ssl_context.load_cert_chain(certfile=CERT_FILE, keyfile=KEY_FILE)
+    return ssl_context
 
 
 async def handler(websocket):
-    global connected_clients, latest_frames
-
-    if len(connected_clients) >= MAX_CLIENTS:
-        print("Max clients reached, rejecting new client.")
+    client_id = register_client(websocket)
+    if client_id is None:
         await websocket.close()
         return
 
-    client_id = str(uuid.uuid4())[:8]
-    connected_clients[websocket] = client_id
-    print(f"New client connected! ID={client_id}, Total clients: {len(connected_clients)}")
-
     try:
         while True:
             try:
@@ -37,28 +34,20 @@ async def handler(websocket):
                 await websocket.close()
                 break
 
-            if isinstance(message, (bytes, bytearray)):
-                nparr = np.frombuffer(message, np.uint8)
-                frame = cv2.imdecode(nparr, cv2.IMREAD_COLOR)
-                if frame is not None:
-                    latest_frames[client_id] = frame
-            else:
-                print(f"Client {client_id} sent non-binary message:", message)
+            handle_message(client_id, message)
 
     except websockets.ConnectionClosed:
         print(f"Client {client_id} disconnected")
     finally:
-        connected_clients.pop(websocket, None)
-        latest_frames.pop(client_id, None)
-        print(f"Client {client_id} removed. Total clients: {len(connected_clients)}")
+        unregister_client(websocket, client_id)
 
 
 async def start_server():
     start_server = await websockets.serve(
         handler,
         "0.0.0.0",
-        12345,
-        ssl=ssl_context,
+        WSS_PORT,
+        ssl=create_ssl_context(),
     )
-    print("WSS server started on port 12345")
+    print(f"WSS server started on port {WSS_PORT}")
     await start_server.wait_closed()
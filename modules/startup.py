@@ -0,0 +1,56 @@
+"""
+Startup phase timing.
+
+    with startup.phase("tracker"):
+        tracker = HandTracker()
+
+    module = startup.timed_import("mediapipe")
+
+Set GESTURE_STARTUP_REPORT=1 to print the report once startup finishes
+(`python -X importtime main.py` gives the per-module breakdown on top).
+"""
+import importlib
+import os
+import threading
+from contextlib import contextmanager
+from time import perf_counter
+
+from modules import metrics
+
+PHASE_SECONDS = metrics.gauge("startup_phase_seconds", "Duration of each startup phase", ["phase"])
+
+_t0 = perf_counter()
+_phases = []  # (name, thread name, start offset, duration)
+_lock = threading.Lock()
+
+
+@contextmanager
+def phase(name: str):
+    start = perf_counter()
+    try:
+        yield
+    finally:
+        duration = perf_counter() - start
+        with _lock:
+            _phases.append((name, threading.current_thread().name, start - _t0, duration))
+        PHASE_SECONDS.labels(phase=name).set(duration)
+
+
+def timed_import(module_name: str):
+    with phase(f"import {module_name}"):
+        return importlib.import_module(module_name)
+
+
+def report() -> str:
+    with _lock:
+        phases = sorted(_phases, key=lambda p: p[2])
+    lines = [f"{'phase':<28} {'thread':<14} {'start':>9} {'took':>9}"]
+    for name, thread, start, duration in phases:
+        lines.append(f"{name:<28} {thread:<14} {start * 1000:>7.1f}ms {duration * 1000:>7.1f}ms")
+    lines.append(f"{'total':<28} {'':<14} {'':>9} {(perf_counter() - _t0) * 1000:>7.1f}ms")
+    return "\n".join(lines)
+
+
+def print_report_if_enabled():
+    if os.environ.get("GESTURE_STARTUP_REPORT"):
+        print(report())
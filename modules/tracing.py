@@ -0,0 +1,198 @@
+"""
+Per-frame stage tracing with Chrome / Perfetto trace export.
+
+    with tracing.frame():
+        with tracing.span("capture"):
+            frame = cam.get_frame()
+        with tracing.span("tracker.process"):
+            tracker.process(frame)
+
+    tracing.dump("trace.json")   # open in ui.perfetto.dev or chrome://tracing
+
+Spans are recorded with perf_counter_ns into a ring buffer holding the last
+`capacity` spans. Tracing is off unless GESTURE_TRACE=1 is set or enable()
+is called; while off, span() returns a shared no-op context manager.
+
+GESTURE_TRACE_SLOW_MS=N dumps the buffer to traces/ whenever one frame takes
+longer than N ms (at most once per SLOW_DUMP_INTERVAL seconds). The buffer can
+also be fetched on demand from GET /debug/trace on the web server, or dumped
+with SIGUSR1 where available.
+"""
+import json
+import os
+import signal
+import threading
+from collections import deque
+from time import perf_counter_ns, strftime
+
+DEFAULT_CAPACITY = 20000        # spans kept in the ring buffer
+SLOW_DUMP_INTERVAL = 10.0       # seconds between automatic slow-frame dumps
+TRACE_DIR = "traces"
+
+enabled = False
+slow_frame_ns = None            # frame duration that triggers a dump, or None
+observer = None                 # optional span_enter/span_exit/frame_end hooks (see memprofile.py)
+
+_spans = deque(maxlen=DEFAULT_CAPACITY)  # (name, tid, start_ns, duration_ns, args)
+_lock = threading.Lock()
+_thread_names = {}
+_last_slow_dump_ns = None
+_pid = os.getpid()
+
+
+# -------------------------
+# Spans
+# -------------------------
+class _NullSpan:
+    __slots__ = ()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+
+_NULL_SPAN = _NullSpan()
+
+
+class _Span:
+    __slots__ = ("name", "args", "start", "duration")
+
+    def __init__(self, name, args):
+        self.name = name
+        self.args = args
+        self.duration = 0
+
+    def __enter__(self):
+        if observer is not None:
+            observer.span_enter(self.name)
+        self.start = perf_counter_ns()
+        return self
+
+    def __exit__(self, *exc):
+        self.duration = perf_counter_ns() - self.start
+        _record(self.name, self.start, self.duration, self.args)
+        if observer is not None:
+            observer.span_exit(self.name)
+        return False
+
+
+class _FrameSpan(_Span):
+    """Span around one whole frame; checks the slow-frame trigger when it ends."""
+
+    __slots__ = ()
+
+    def __exit__(self, *exc):
+        super().__exit__(*exc)
+        if slow_frame_ns is not None and self.duration > slow_frame_ns:
+            _slow_frame(self.duration)
+        if observer is not None:
+            observer.frame_end(self.name)
+        return False
+
+
+def span(name: str, **args):
+    """Context manager timing one stage. `args` show up in the trace viewer."""
+    if not enabled:
+        return _NULL_SPAN
+    return _Span(name, args or None)
+
+
+def frame(name: str = "frame", **args):
+    """Like span(), for the outermost span of a frame (slow-frame trigger)."""
+    if not enabled:
+        return _NULL_SPAN
+    return _FrameSpan(name, args or None)
+
+
+def _record(name, start, duration, args):
+    thread = threading.current_thread()
+    tid = thread.ident
+    with _lock:
+        if tid not in _thread_names:
+            _thread_names[tid] = thread.name
+        _spans.append((name, tid, start, duration, args))
+
+
+# -------------------------
+# Control
+# -------------------------
+def enable(capacity: int = DEFAULT_CAPACITY, slow_frame_ms: float = None):
+    global enabled, _spans, slow_frame_ns
+    with _lock:
+        if _spans.maxlen != capacity:
+            _spans = deque(_spans, maxlen=capacity)
+    slow_frame_ns = int(slow_frame_ms * 1e6) if slow_frame_ms else None
+    enabled = True
+
+
+def disable():
+    global enabled
+    enabled = False
+
+
+def clear():
+    with _lock:
+        _spans.clear()
+
+
+# -------------------------
+# Export
+# -------------------------
+def chrome_trace() -> dict:
+    """Buffer contents in the Chrome trace event format (timestamps in µs)."""
+    with _lock:
+        spans = list(_spans)
+        thread_names = dict(_thread_names)
+
+    events = [
+        {"name": "thread_name", "ph": "M", "pid": _pid, "tid": tid, "args": {"name": name}}
+        for tid, name in thread_names.items()
+    ]
+    for name, tid, start, duration, args in spans:
+        event = {
+            "name": name,
+            "ph": "X",
+            "pid": _pid,
+            "tid": tid,
+            "ts": start / 1000,
+            "dur": duration / 1000,
+        }
+        if args:
+            event["args"] = args
+        events.append(event)
+    return {"traceEvents": events, "displayTimeUnit": "ms"}
+
+
+def dump(path: str = None) -> str:
+    """Write the buffer as trace JSON and return the path."""
+    if path is None:
+        os.makedirs(TRACE_DIR, exist_ok=True)
+        path = os.path.join(TRACE_DIR, f"trace-{strftime('%Y%m%d-%H%M%S')}.json")
+    with open(path, "w") as f:
+        json.dump(chrome_trace(), f, default=str)
+    return path
+
+
+def _slow_frame(duration_ns):
+    global _last_slow_dump_ns
+    now = perf_counter_ns()
+    if _last_slow_dump_ns is not None and now - _last_slow_dump_ns < SLOW_DUMP_INTERVAL * 1e9:
+        return
+    _last_slow_dump_ns = now
+    path = dump()
+    print(f"Slow frame ({duration_ns / 1e6:.1f} ms), trace written to {path}")
+
+
+def _enable_from_env():
+    if os.environ.get("GESTURE_TRACE") or os.environ.get("GESTURE_TRACE_SLOW_MS"):
+        slow_ms = os.environ.get("GESTURE_TRACE_SLOW_MS")
+        enable(slow_frame_ms=float(slow_ms) if slow_ms else None)
+
+        # kill -USR1 <pid> dumps the buffer (signal handlers only work on the main thread)
+        if hasattr(signal, "SIGUSR1") and threading.current_thread() is threading.main_thread():
+            signal.signal(signal.SIGUSR1, lambda *_: print("Trace written to", dump()))
+
+
+_enable_from_env()
@@ -1,2 +1,19 @@
 CERT_FILE = "pems/cert.pem"
 KEY_FILE = "pems/key.pem"
+
+HTTP_PORT = 10001
+WSS_PORT = 12345
+
+# Frames are always accepted on HTTP_PORT at /ws (same TLS listener as the web UI).
+# Enable this to also run the standalone `websockets` server on WSS_PORT.
+STANDALONE_WSS = False
+
+# Desktop app frame source: camera index, video file or image directory.
+# GESTURE_SOURCE overrides it (GESTURE_SOURCE_REALTIME=0 plays files at max speed).
+CAMERA_SOURCE = 0
+# Requested capture settings (None = driver default); MJPG saves USB bandwidth
+CAMERA_WIDTH = 640
+CAMERA_HEIGHT = 480
+CAMERA_FPS = 30
+CAMERA_FOURCC = "MJPG"
+CAMERA_BUFFER_SIZE = 1  # don't let the driver queue stale frames
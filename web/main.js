@@ -16,7 +16,8 @@ let wakeLock = null;
 window.addEventListener("load", () => {
     const loc = window.location;
     const wsProtocol = loc.protocol === "https:" ? "wss:" : "ws:";
-    const wsUrl = `${wsProtocol}//${loc.hostname}:12345`;
+    // Frames go to the same origin that served this page
+    const wsUrl = `${wsProtocol}//${loc.host}/ws`;
 
     socket = new WebSocket(wsUrl);
 